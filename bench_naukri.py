@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark for naukri_apply.py against the offline mock site (mock_naukri.py).
+
+Each run starts from an empty ledger in a temporary directory, drives the real script
+headless, and reads back its timing spans:
+
+    python bench_naukri.py --runs 3 --max-apply 20 --latency-ms 100
+    python bench_naukri.py --env WORKERS=3 --env HARVEST_MODE=http --json after.json
+    python bench_naukri.py --runs 1 --max-commands-per-job 40   # exits 1 if any job sends more
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_naukri import MockConfig, start_mock_server
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "naukri_apply.py")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round((len(ordered) - 1) * pct)))]
+
+
+def run_once(base_url, args, extra_env):
+    with tempfile.TemporaryDirectory(prefix="naukri-bench-") as run_dir:
+        spans_file = os.path.join(run_dir, "spans.jsonl")
+        env = dict(os.environ)
+        env.pop("NAUKRI_RUN_ID", None)
+        env.update({
+            "NAUKRI_BASE_URL": base_url,
+            "NAUKRI_EMAIL": "bench@example.com",
+            "NAUKRI_PASSWORD": "bench",
+            "SKILLS": "Java, Spring Boot",
+            "EXPERIENCE": "5",
+            "TEXT_VALUE_FOR_BOT": "5 years, 30 days notice, expecting 40 LPA",
+            "MAX_APPLY": str(args.max_apply),
+            "HEADLESS": "True",
+            "SESSION_FILE": "",
+            "SPANS_FILE": spans_file,
+        })
+        if args.max_commands_per_job:
+            env["MAX_COMMANDS_PER_JOB"] = str(args.max_commands_per_job)
+        env.update(extra_env)
+        start = time.monotonic()
+        proc = subprocess.run(
+            [sys.executable, SCRIPT], cwd=run_dir, env=env, capture_output=True, text=True, timeout=args.timeout
+        )
+        wall = time.monotonic() - start
+        if proc.returncode != 0:
+            print(proc.stdout[-2000:], proc.stderr[-2000:], sep="\n")
+
+        spans = []
+        if os.path.exists(spans_file):
+            with open(spans_file) as f:
+                spans = [json.loads(line) for line in f if line.strip()]
+        statuses = {}
+        ledger_file = os.path.join(run_dir, "applied_jobs.db")
+        if os.path.exists(ledger_file):
+            with sqlite3.connect(ledger_file) as conn:
+                statuses = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    phases = {}
+    for rec in spans:
+        phases.setdefault(rec["phase"], []).append(rec["dur"])
+    jobs = [rec for rec in spans if rec["phase"] == "job"]
+    commands = [rec["commands"] for rec in jobs if "commands" in rec]
+    return {
+        "wall_s": wall,
+        "jobs": len(jobs),
+        "jobs_per_min": len(jobs) / (wall / 60) if wall else 0.0,
+        "commands_per_job": statistics.mean(commands) if commands else None,
+        "over_budget": [
+            (rec["job_id"], rec["commands"]) for rec in jobs
+            if args.max_commands_per_job and rec.get("commands", 0) > args.max_commands_per_job
+        ],
+        "phases": {
+            name: {"count": len(d), "p50_ms": percentile(d, 0.5) * 1000, "p95_ms": percentile(d, 0.95) * 1000,
+                   "total_s": sum(d)}
+            for name, d in phases.items()
+        },
+        "statuses": statuses,
+        "returncode": proc.returncode,
+    }
+
+
+def summarize(results):
+    def mean(key):
+        values = [r[key] for r in results if r[key] is not None]
+        return statistics.mean(values) if values else float("nan")
+
+    def spread(key):
+        values = [r[key] for r in results if r[key] is not None]
+        return statistics.stdev(values) if len(values) > 1 else 0.0
+
+    print(f"\n{len(results)} runs")
+    print(f"  wall time         {mean('wall_s'):8.1f} s   (sd {spread('wall_s'):.1f})")
+    print(f"  jobs per run      {mean('jobs'):8.1f}")
+    print(f"  jobs/minute       {mean('jobs_per_min'):8.2f}     (sd {spread('jobs_per_min'):.2f})")
+    print(f"  commands/job      {mean('commands_per_job'):8.1f}")
+    names = sorted({name for r in results for name in r["phases"]})
+    print(f"\n  {'phase':<28} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'total s':>9}")
+    for name in names:
+        rows = [r["phases"][name] for r in results if name in r["phases"]]
+        print(
+            f"  {name:<28} {statistics.mean(x['count'] for x in rows):>7.1f} "
+            f"{statistics.mean(x['p50_ms'] for x in rows):>9.0f} {statistics.mean(x['p95_ms'] for x in rows):>9.0f} "
+            f"{statistics.mean(x['total_s'] for x in rows):>9.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark naukri_apply.py against the mock site")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-apply", type=int, default=20)
+    parser.add_argument("--timeout", type=int, default=1800, help="seconds per run")
+    parser.add_argument("--latency-ms", type=int, default=100)
+    parser.add_argument("--apply-latency-ms", type=int, default=200)
+    parser.add_argument("--chatbot-depth", type=int, default=2)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--jobs-per-page", type=int, default=20)
+    parser.add_argument("--throttle-rps", type=float, default=0, help="mock serves 429 pages above this rate")
+    parser.add_argument("--captcha-every", type=int, default=0, help="mock serves a captcha for every Nth job")
+    parser.add_argument("--apply-fail-every", type=int, default=0, help="mock's apply API fails every Nth call")
+    parser.add_argument("--apply-then-chatbot", action="store_true",
+                        help="mock's chatbot jobs POST on Apply, then open the chatbot")
+    parser.add_argument("--max-commands-per-job", type=int, default=0,
+                        help="fail if any job sends more WebDriver commands than this")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the script, e.g. WORKERS=3")
+    parser.add_argument("--json", help="write per-run results to this file")
+    args = parser.parse_args()
+
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    config = MockConfig(
+        latency_ms=args.latency_ms, apply_latency_ms=args.apply_latency_ms, chatbot_depth=args.chatbot_depth,
+        pages=args.pages, jobs_per_page=args.jobs_per_page, throttle_rps=args.throttle_rps,
+        captcha_every=args.captcha_every, apply_fail_every=args.apply_fail_every,
+        apply_then_chatbot=args.apply_then_chatbot,
+    )
+    server, base_url = start_mock_server(config)
+    print(f"Mock site at {base_url}; {args.runs} runs, MAX_APPLY={args.max_apply}, env={extra_env}")
+
+    results = []
+    try:
+        for i in range(args.runs):
+            result = run_once(base_url, args, extra_env)
+            results.append(result)
+            print(
+                f"run {i + 1}: {result['wall_s']:.1f}s, {result['jobs']} jobs, "
+                f"{result['jobs_per_min']:.2f} jobs/min, commands/job={result['commands_per_job']}, "
+                f"statuses={result['statuses']}"
+            )
+    finally:
+        server.shutdown()
+
+    summarize(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "runs": results}, f, indent=2)
+    over = [job for r in results for job in r["over_budget"]]
+    if over:
+        print(f"\nFAIL: {len(over)} jobs over {args.max_commands_per_job} WebDriver commands: "
+              + ", ".join(f"{job_id}={n}" for job_id, n in over))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
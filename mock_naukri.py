@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the parts of naukri.com that naukri_apply.py drives.
+
+Serves login, search, result pages, job details and the apply chatbot with the same
+ids/classes the script relies on, with configurable latency and chatbot depth:
+
+    python mock_naukri.py --port 8765 --latency-ms 150 --chatbot-depth 3
+    NAUKRI_BASE_URL=http://127.0.0.1:8765/ SESSION_FILE= python naukri_apply.py
+"""
+import argparse
+import html
+import json
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+QUESTIONS = [
+    ("What is your notice period?", ["Immediate", "15 days or less", "1 month", "2 months", "3 months"]),
+    ("What is your expected CTC (in lakhs)?", []),
+    ("How many years of experience do you have in Java?", []),
+    ("What is your current location?", []),
+    ("Are you willing to relocate?", ["Yes", "No"]),
+    ("What is your current CTC (in lakhs)?", []),
+]
+
+SALARIES = ["30-45 Lacs PA", "Not disclosed", "8-12 Lacs PA", "25-40 Lacs PA", "1-1.5 Cr PA", "35 Lacs PA"]
+COMPANIES = ["Acme Software", "Globex", "Initech", "Umbrella Tech", "Hooli", "Stark Systems", "Wayne Digital"]
+TAGS = [
+    ["Java", "Spring Boot", "Microservices"], ["Angular", "Java", "MySQL"], ["Python", "Django"],
+    ["React", "Node.js"], ["Java", "Kafka", "AWS"], ["Spring Boot", "MySQL", "Angular"],
+]
+LOCATIONS = ["Bengaluru", "Pune", "Hyderabad", "Chennai", "Mumbai", "Remote", "Hybrid - Noida"]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>.hidden {{ display: none; }} a, button, div.sendMsg {{ cursor: pointer; }}</style>
+</head><body>
+{body}
+</body></html>"""
+
+
+class MockConfig:
+    def __init__(self, latency_ms=0, apply_latency_ms=0, chatbot_depth=2, chatbot_every=3,
+                 company_site_every=7, pages=5, jobs_per_page=20, links_per_page=150, throttle_rps=0,
+                 captcha_every=0, apply_fail_every=0, apply_then_chatbot=False):
+        self.latency_ms = latency_ms
+        self.apply_latency_ms = apply_latency_ms
+        self.chatbot_depth = chatbot_depth
+        self.chatbot_every = chatbot_every
+        self.company_site_every = company_site_every
+        self.pages = pages
+        self.jobs_per_page = jobs_per_page
+        self.links_per_page = links_per_page
+        self.throttle_rps = throttle_rps  # page requests per second above which 429 pages are served
+        self.captcha_every = captcha_every  # every Nth job detail request gets a captcha page
+        self.apply_fail_every = apply_fail_every  # every Nth apply API call answers with a failure
+        self.apply_then_chatbot = apply_then_chatbot  # chatbot jobs POST on Apply, then open the chatbot
+
+
+def job_id_for(page, index):
+    return str(200000000000 + page * 1000 + index)
+
+
+def job_kind(config, job_id):
+    """'company_site', 'chatbot' or 'direct', decided deterministically from the id."""
+    n = int(job_id) % 1000
+    if config.company_site_every and n % config.company_site_every == 0:
+        return "company_site"
+    if config.chatbot_every and config.chatbot_depth and n % config.chatbot_every == 0:
+        return "chatbot"
+    return "direct"
+
+
+def filler_links(config):
+    links = "".join(f'<a href="/browse/{i}">Browse jobs {i}</a> ' for i in range(config.links_per_page))
+    return f'<footer class="footer">{links}</footer>'
+
+
+def header():
+    return """<div class="nI-gNb-header"><div class="nI-gNb-sb__main">
+<input type="text" placeholder="Enter keyword / designation / companies" class="suggestor-input">
+</div></div>"""
+
+
+def login_page():
+    body = """<form id="loginForm" onsubmit="return false;">
+<input id="usernameField" type="text"><input id="passwordField" type="password">
+<button type="submit" onclick="document.cookie = 'mock_auth=1; path=/'; location.href = '/mnjuser/homepage';">Login</button>
+</form>"""
+    return PAGE_TEMPLATE.format(title="Login", body=body)
+
+
+def home_page(config):
+    return PAGE_TEMPLATE.format(title="Home", body=header() + "<h1>Welcome back</h1>" + filler_links(config))
+
+
+def search_page(config):
+    options = "".join(f'<li title="{n} years">{n} years</li>' for n in range(0, 31))
+    body = """<div class="nI-gNb-header">
+<div class="nI-gNb-sb__main" onclick="document.getElementById('sbExpanded').classList.remove('hidden');">Search jobs here</div>
+<div id="sbExpanded" class="hidden">
+<input type="text" placeholder="Enter keyword / designation / companies" id="kw">
+<div class="dropdownMainContainer" onclick="document.getElementById('expList').classList.remove('hidden');">Select experience</div>
+<ul id="expList" class="hidden" onclick="if (event.target.title) { window.__exp = event.target.title.split(' ')[0]; this.classList.add('hidden'); }">%s</ul>
+<button class="nI-gNb-sb__icon-wrapper" onclick="
+    var k = document.getElementById('kw').value;
+    var slug = k.toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/^-+|-+$/g, '');
+    location.href = '/' + slug + '-jobs?k=' + encodeURIComponent(k) + (window.__exp ? '&experience=' + window.__exp : '');
+">Search</button>
+</div></div>""" % options
+    return PAGE_TEMPLATE.format(title="Jobs in India", body=body + filler_links(config))
+
+
+def results_page(config, slug, page, query):
+    cards = []
+    for i in range(config.jobs_per_page):
+        job_id = job_id_for(page, i)
+        n = page * config.jobs_per_page + i
+        title = f"Java Developer {n}"
+        company = COMPANIES[n % len(COMPANIES)]
+        applied = '<span class="applied-tag">Applied</span>' if n % 17 == 5 else ""
+        # sort=f (newest first): posting age grows with the page number
+        posted = f"{page - 1} Days Ago" if query.get("sort") == "f" else f"{n % 30} Days Ago"
+        cards.append(f"""<div class="srp-jobtuple-wrapper" data-job-id="{job_id}"><div class="cust-job-tuple">
+<div class="row1"><a class="title" href="/job-listings-java-developer-{job_id}" target="_blank">{html.escape(title)}</a></div>
+<div class="row2"><span class="comp-dtls-wrap"><a class="comp-name" href="/company/{n % 7}">{company}</a></span></div>
+<div class="row3"><span class="exp-wrap"><span class="expwdth">{n % 6 + 3}-{n % 6 + 8} Yrs</span></span>
+<span class="sal-wrap"><span>{SALARIES[n % len(SALARIES)]}</span></span>
+<span class="loc-wrap"><span class="locWdth">{LOCATIONS[n % len(LOCATIONS)]}</span></span></div>
+<div class="row4"><span class="job-desc">Java, Spring Boot, microservices, REST, SQL.</span></div>
+<div class="row5"><ul class="tags-gt">{"".join(f'<li class="tag-li">{t}</li>' for t in TAGS[n % len(TAGS)])}</ul></div>
+<div class="row6"><span class="job-post-day">{posted}</span>{applied}</div>
+</div></div>""")
+    qs = "?" + urlencode(query) if query else ""
+    links = "".join(
+        f'<a href="/{slug}-jobs{"" if p == 1 else f"-{p}"}{qs}">{p}</a>' for p in range(1, config.pages + 1)
+    )
+    next_link = f'<a href="/{slug}-jobs-{page + 1}{qs}">Next</a>' if page < config.pages else ""
+    body = (header() + '<div class="styles_jlc__main">' + "".join(cards) + "</div>"
+            + f'<div class="lastCompMark"><div class="styles_pages__v1rAK">{links}</div>{next_link}</div>'
+            + filler_links(config))
+    return PAGE_TEMPLATE.format(title=f"{slug} jobs - page {page}", body=body)
+
+
+def detail_page(config, job_id):
+    kind = job_kind(config, job_id)
+    if kind == "company_site":
+        button = '<button id="company-site-button" onclick="window.open(\'about:blank\')">Apply on company site</button>'
+    else:
+        button = '<button id="apply-button" class="styles_apply-button__uJI3A">Apply</button>'
+    questions = QUESTIONS[:config.chatbot_depth] if kind == "chatbot" else []
+    script = """<script>
+var QUESTIONS = %s;
+var APPLY_THEN_CHATBOT = %s;
+var asked = 0;
+var btn = document.getElementById('apply-button');
+var drawer = document.querySelector('.chatbot_DrawerContentWrapper');
+var list = drawer.querySelector('ul');
+function markApplied() { btn.innerText = 'Applied'; btn.disabled = true; drawer.classList.add('hidden'); }
+function ask() {
+    var q = QUESTIONS[asked];
+    var li = document.createElement('li'); li.className = 'botItem';
+    li.innerHTML = '<div class="botMsg"><span></span></div>';
+    li.querySelector('span').innerText = q[0];
+    list.appendChild(li);
+    var chips = drawer.querySelector('.chipsContainer');
+    chips.innerHTML = '';
+    q[1].forEach(function (opt) {
+        var chip = document.createElement('div'); chip.className = 'chatbot_Chip chipItem'; chip.innerText = opt;
+        chip.onclick = function () { drawer.__choice = opt; };
+        chips.appendChild(chip);
+    });
+}
+function openChatbot() { drawer.classList.remove('hidden'); ask(); }
+function submitApply(then) {
+    fetch('/api/apply/%s', {method: 'POST', credentials: 'same-origin'})
+        .then(function (r) { return r.json(); })
+        .then(function (data) {
+            if (then) { then(data); } else if (data.status === 'success') { markApplied(); } else { btn.innerText = 'Apply'; }
+        });
+}
+if (btn) {
+    btn.onclick = function () {
+        if (!QUESTIONS.length) { submitApply(); }
+        // like the real apply workflow: the first POST answers, then the questionnaire renders
+        else if (APPLY_THEN_CHATBOT) { submitApply(function () { setTimeout(openChatbot, 300); }); }
+        else { openChatbot(); }
+    };
+}
+drawer.querySelector('.sendMsg').onclick = function () {
+    var editable = drawer.querySelector('.textArea');
+    var answer = drawer.__choice || editable.innerText.trim();
+    if (!answer) { return; }
+    var li = document.createElement('li'); li.className = 'userItem'; li.innerText = answer;
+    list.appendChild(li);
+    editable.innerText = ''; drawer.__choice = null;
+    asked++;
+    setTimeout(function () { if (asked < QUESTIONS.length) { ask(); } else { submitApply(); } }, 250);
+};
+</script>""" % (json.dumps(questions), json.dumps(config.apply_then_chatbot), job_id)
+    body = (header()
+            + f'<div class="styles_jd-header__x8NkP"><h1>Java Developer</h1>{button}</div>'
+            + '<div class="chatbot_DrawerContentWrapper hidden"><ul class="chatbot_MessageContainer"></ul>'
+            + '<div class="chipsContainer"></div>'
+            + '<div class="chatbot_InputContainer"><div class="textArea" contenteditable="true"></div>'
+            + '<div class="sendMsg">Save</div></div></div>'
+            + '<section class="job-desc">Java, Spring Boot, microservices, REST, SQL. Notice period up to 60 days.</section>'
+            + filler_links(config) + script)
+    return PAGE_TEMPLATE.format(title=f"Job {job_id}", body=body)
+
+
+RESULTS_RE = re.compile(r"^/([a-z0-9-]+?)-jobs(?:-(\d+))?$")
+DETAIL_RE = re.compile(r"^/job-listings-[a-z0-9-]*?-(\d{12})$")
+APPLY_RE = re.compile(r"^/api/apply/(\d{12})$")
+
+
+def throttled_page():
+    return PAGE_TEMPLATE.format(title="429 Too Many Requests", body="<h1>Too Many Requests</h1>")
+
+
+def captcha_page():
+    return PAGE_TEMPLATE.format(title="Security Check", body='<p>Please verify you are human.</p><div class="g-recaptcha"></div>')
+
+
+def make_handler(config):
+    lock = threading.Lock()
+    recent = deque()  # arrival times of page requests in the last second
+    details_served = [0]
+    applies_served = [0]
+
+    def over_limit():
+        now = time.monotonic()
+        with lock:
+            while recent and now - recent[0] > 1:
+                recent.popleft()
+            recent.append(now)
+            return len(recent) > config.throttle_rps
+
+    def captcha_due():
+        with lock:
+            details_served[0] += 1
+            return details_served[0] % config.captcha_every == 0
+
+    def apply_fails():
+        with lock:
+            applies_served[0] += 1
+            return applies_served[0] % config.apply_fail_every == 0
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send(self, body, status=200, content_type="text/html; charset=utf-8", headers=()):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def logged_in(self):
+            return "mock_auth=1" in (self.headers.get("Cookie") or "")
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            path = url.path.rstrip("/") or "/"
+            if config.latency_ms:
+                time.sleep(config.latency_ms / 1000)
+            if config.throttle_rps and over_limit():
+                return self.send(throttled_page(), status=429)
+            if path == "/nlogin/login":
+                return self.send(login_page())
+            if path in ("/", "/mnjuser/homepage"):
+                if not self.logged_in():
+                    return self.send("", status=302, headers=[("Location", "/nlogin/login")])
+                return self.send(home_page(config))
+            if path == "/jobs-in-india":
+                return self.send(search_page(config))
+            m = DETAIL_RE.match(path)
+            if m:
+                if config.captcha_every and captcha_due():
+                    return self.send(captcha_page())
+                return self.send(detail_page(config, m.group(1)))
+            m = RESULTS_RE.match(path)
+            if m:
+                page = int(m.group(2) or 1)
+                if page > config.pages:
+                    return self.send(PAGE_TEMPLATE.format(title="No results", body=header()))
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                return self.send(results_page(config, m.group(1), page, query))
+            self.send(PAGE_TEMPLATE.format(title="Not found", body="Not found"), status=404)
+
+        def do_POST(self):
+            m = APPLY_RE.match(urlparse(self.path).path)
+            if not m:
+                return self.send('{"status": "error"}', status=404, content_type="application/json")
+            if config.apply_latency_ms:
+                time.sleep(config.apply_latency_ms / 1000)
+            if config.apply_fail_every and apply_fails():
+                result = {"status": "failure", "message": "Daily application limit reached", "jobId": m.group(1)}
+            else:
+                result = {"status": "success", "jobId": m.group(1)}
+            self.send(json.dumps(result), content_type="application/json")
+
+    return Handler
+
+
+def start_mock_server(config, host="127.0.0.1", port=0):
+    """Start the stand-in in a daemon thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in for naukri.com")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=0, help="delay before every page response")
+    parser.add_argument("--apply-latency-ms", type=int, default=0, help="delay before the apply API responds")
+    parser.add_argument("--chatbot-depth", type=int, default=2, help="questions per chatbot (0 disables chatbots)")
+    parser.add_argument("--chatbot-every", type=int, default=3, help="every Nth job opens a chatbot")
+    parser.add_argument("--company-site-every", type=int, default=7, help="every Nth job applies on company site")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--jobs-per-page", type=int, default=20)
+    parser.add_argument("--links-per-page", type=int, default=150, help="filler anchors on every page")
+    parser.add_argument("--throttle-rps", type=float, default=0, help="serve 429 pages above this many requests/s")
+    parser.add_argument("--captcha-every", type=int, default=0, help="every Nth job detail is a captcha page")
+    parser.add_argument("--apply-fail-every", type=int, default=0, help="every Nth apply API call fails")
+    parser.add_argument("--apply-then-chatbot", action="store_true",
+                        help="chatbot jobs POST to the apply API on Apply, then open the chatbot")
+    args = parser.parse_args()
+    config = MockConfig(
+        latency_ms=args.latency_ms, apply_latency_ms=args.apply_latency_ms, chatbot_depth=args.chatbot_depth,
+        chatbot_every=args.chatbot_every, company_site_every=args.company_site_every, pages=args.pages,
+        jobs_per_page=args.jobs_per_page, links_per_page=args.links_per_page, throttle_rps=args.throttle_rps,
+        captcha_every=args.captcha_every, apply_fail_every=args.apply_fail_every,
+        apply_then_chatbot=args.apply_then_chatbot,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    print(f"Mock Naukri serving on http://{args.host}:{args.port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,34 @@
 #!/usr/bin/env python3
 import os
+import base64
 import re
 import time
 import sys
+import json
+import hashlib
+from contextlib import contextmanager
+from functools import lru_cache
 import logging
+import multiprocessing
+import queue
+import signal
+import sqlite3
+import threading
+import zipfile
+from collections import deque
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+import numpy as np
 import openpyxl
+import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import (
     TimeoutException,
-    NoSuchElementException,
     StaleElementReferenceException,
     ElementClickInterceptedException,
     ElementNotInteractableException,
@@ -30,357 +44,1792 @@ NAUKRI_EMAIL = os.getenv("NAUKRI_EMAIL")
 NAUKRI_PASSWORD = os.getenv("NAUKRI_PASSWORD")
 SKILLS = os.getenv("SKILLS")
 EXPERIENCE = os.getenv("EXPERIENCE")  # years
-EXCEL_FILE = os.getenv("EXCEL_FILE", "applied_jobs.xlsx")
+EXCEL_FILE = os.getenv("EXCEL_FILE", "applied_jobs.xlsx")  # exported at end of run
+LEDGER_FILE = os.getenv("LEDGER_FILE", "applied_jobs.db")  # source of truth for job records
 MIN_EXPECTED_SALARY = float(os.getenv("MIN_EXPECTED_SALARY", "25"))  # LPA
+FILTERS_FILE = os.getenv("FILTERS_FILE", "card_filters.json")  # card-level rules checked before opening jobs
+REPOST_WINDOW_DAYS = float(os.getenv("REPOST_WINDOW_DAYS", "30"))  # same role under a new id is skipped within this; 0 = off
 MAX_APPLY = int(os.getenv("MAX_APPLY", "50"))  # Number of successful applications to reach
+WORKERS = int(os.getenv("WORKERS", "1"))  # Chrome worker processes for job details; 1 = serial
+PREFETCH_TABS = int(os.getenv("PREFETCH_TABS", "0"))  # serial mode: detail pages preloaded in background tabs; 0 = off
+WAIT_POLL = float(os.getenv("WAIT_POLL", "0.1"))  # seconds between readiness checks
 CHROME_DRIVER_PATH = os.getenv("CHROME_DRIVER_PATH", "")  # optional path to chromedriver
 HEADLESS = os.getenv("HEADLESS", "False").lower() == "true"
-
-LOGIN_URL = "https://www.naukri.com/nlogin/login"
-SEARCH_URL = "https://www.naukri.com/jobs-in-india"
-
-TEXT_VALUE_FOR_BOT = os.getenv("TEXT_VALUE_FOR_BOT")
+BLOCK_RESOURCES = os.getenv("BLOCK_RESOURCES", "")  # e.g. "images,media,fonts,trackers"; empty = load everything
+SESSION_FILE = os.getenv("SESSION_FILE", "naukri_session.json")  # saved login session; empty disables reuse
+RESUME = os.getenv("RESUME", "True").lower() == "true"  # continue an interrupted run from its checkpoint
+RESUME_MAX_AGE_HOURS = float(os.getenv("RESUME_MAX_AGE_HOURS", "12"))  # older checkpoints start from page 1
+INCREMENTAL = os.getenv("INCREMENTAL", "False").lower() == "true"  # newest first; stop once caught up with the last run
+INCREMENTAL_STOP_STREAK = int(os.getenv("INCREMENTAL_STOP_STREAK", "25"))  # known/older cards in a row that end the crawl
+INCREMENTAL_SORT = os.getenv("INCREMENTAL_SORT", "sort=f")  # query parameters that sort results by freshness
+HARVEST_MODE = os.getenv("HARVEST_MODE", "browser").lower()  # "browser" or "http" for reading result pages
+HARVEST_MAX_PAGES = int(os.getenv("HARVEST_MAX_PAGES", "20"))  # page cap for HTTP harvesting
+QUERIES_FILE = os.getenv("QUERIES_FILE", "queries.json")  # several queries/profiles run concurrently, if present
+DAEMON_INTERVAL_MINUTES = float(os.getenv("DAEMON_INTERVAL_MINUTES", "0"))  # --daemon: scheduled search period; 0 = queue only
+DAEMON_QUEUE_DIR = os.getenv("DAEMON_QUEUE_DIR", "naukri_queue")  # --daemon: *.json run requests to pick up
+
+BASE_URL = os.getenv("NAUKRI_BASE_URL", "https://www.naukri.com/").rstrip("/") + "/"
+LOGIN_URL = BASE_URL + "nlogin/login"
+SESSION_CHECK_URL = BASE_URL + "mnjuser/homepage"  # redirects to login when logged out
+SEARCH_URL = BASE_URL + "jobs-in-india"
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/116.0.5845.140 Safari/537.36")
+
+JD_FILE = os.getenv("JD_FILE", "jd.txt")  # target role description for relevance scoring
+RELEVANCE_MIN_SCORE = float(os.getenv("RELEVANCE_MIN_SCORE", "0"))  # cosine score needed to open a job; 0 = off
+RELEVANCE_TOP_K = int(os.getenv("RELEVANCE_TOP_K", "0"))  # open at most K best new jobs per page; 0 = off
+RELEVANCE_CACHE_FILE = os.getenv("RELEVANCE_CACHE_FILE", "relevance_model.json")  # vocabulary + document counts
+
+TEXT_VALUE_FOR_BOT = os.getenv("TEXT_VALUE_FOR_BOT")  # fallback chatbot answer
+PROFILE_FILE = os.getenv("PROFILE_FILE", "chatbot_profile.json")  # answers for classified chatbot questions
+CHATBOT_CACHE_FILE = os.getenv("CHATBOT_CACHE_FILE", "chatbot_answers.json")  # accepted question -> answer memo
 
 # ---------------- LOGGING ----------------
 logging.basicConfig(
     filename="naukri_log.txt",
     level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
+    format="%(asctime)s - %(processName)s - %(levelname)s - %(message)s",
 )
-logging.info("Script started")
-print(f"Script started (HEADLESS={HEADLESS}). Check naukri_log.txt for detail.")
-
-# ---------------- EXCEL SETUP ----------------
-try:
-    wb = openpyxl.load_workbook(EXCEL_FILE)
-    sheet = wb.active
-    logging.info(f"Loaded existing Excel: {EXCEL_FILE}")
-except Exception:
-    wb = openpyxl.Workbook()
-    sheet = wb.active
-    sheet.append(["Job ID", "Job Title", "Company", "Salary", "Job Link", "Status"])
-    logging.info(f"Created new Excel: {EXCEL_FILE}")
 
+# ---------------- STATE FILES ----------------
+def atomic_json_merge(path, data, merge=None, **dump_options):
+    """
+    Write data to the JSON file at path through a per-process temp file and os.replace. With merge, the
+    file's current content ({} if missing or unreadable) is folded in first and merge(on_disk, data) is
+    written, so processes sharing the file keep each other's additions. Returns what was written.
+    """
+    if merge:
+        on_disk = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    on_disk = json.load(f)
+            except ValueError as e:
+                logging.warning(f"Replacing unreadable {path}: {e}")
+        data = merge(on_disk, data)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, **dump_options)
+    os.replace(tmp_path, path)
+    return data
+
+# ---------------- TIMING SPANS ----------------
+SPANS_FILE = os.getenv("SPANS_FILE", "")  # JSONL timing spans + end-of-run report; empty disables
+TRACE_COMMANDS = os.getenv("TRACE_COMMANDS", "False").lower() == "true"  # time WebDriver commands by call site
+TRACE_TOP = int(os.getenv("TRACE_TOP", "15"))  # call sites listed in the command report
+MAX_COMMANDS_PER_JOB = int(os.getenv("MAX_COMMANDS_PER_JOB", "0"))  # flag jobs sending more commands; 0 = off
+RUN_ID = os.getenv("NAUKRI_RUN_ID") or f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+os.environ["NAUKRI_RUN_ID"] = RUN_ID  # inherited by worker processes, so their spans join this run
+
+span_out = None
+current_job_id = None  # job the current process is working on, attached to every span
+webdriver_commands = 0  # WebDriver commands sent by this process (counted when SPANS_FILE or tracing is on)
+command_stats = {}  # (command, call site) -> [count, seconds]
+job_commands = {}  # job id -> commands sent while it was the current job
+job_sites = {}  # call site -> commands for the job in progress
+budget_overruns = []  # (job id, commands) over MAX_COMMANDS_PER_JOB
+SOURCE_FILE = sys._getframe().f_code.co_filename  # call sites are the innermost frames of this script
+
+def record_span(phase, start, duration, job_id=None, outcome=None, **fields):
+    global span_out
+    if span_out is None:
+        span_out = open(SPANS_FILE, "a", buffering=1)
+    rec = {
+        "run": RUN_ID, "pid": os.getpid(), "phase": phase, "job_id": job_id,
+        "outcome": outcome, "start": round(start, 3), "dur": round(duration, 4), **fields,
+    }
+    span_out.write(json.dumps(rec) + "\n")
+    recent_spans.append(rec)
+
+@contextmanager
+def span(phase, job_id=None):
+    """Time a phase; set span_info["outcome"] inside the block to tag it. No-op unless SPANS_FILE is set."""
+    span_info = {"outcome": "ok"}
+    if not SPANS_FILE:
+        yield span_info
+        return
+    start = time.time()
+    t0 = time.monotonic()
+    try:
+        yield span_info
+    except BaseException:
+        span_info["outcome"] = "error"
+        raise
+    finally:
+        fields = {k: v for k, v in span_info.items() if k != "outcome"}
+        record_span(phase, start, time.monotonic() - t0, job_id or current_job_id, span_info["outcome"], **fields)
+
+def call_site():
+    """'function:line' of the innermost frame of this script above the WebDriver client."""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename != SOURCE_FILE:
+        frame = frame.f_back
+    return f"{frame.f_code.co_name}:{frame.f_lineno}" if frame else "?"
+
+def count_webdriver_commands(drv):
+    """
+    Count every command sent through drv (WebElement calls go through the same execute()). With
+    TRACE_COMMANDS or MAX_COMMANDS_PER_JOB also time each one by command and call site, per job.
+    """
+    send = drv.execute
+    tracing = TRACE_COMMANDS or MAX_COMMANDS_PER_JOB > 0
+
+    def execute(driver_command, params=None):
+        global webdriver_commands
+        webdriver_commands += 1
+        if not tracing:
+            return send(driver_command, params)
+        site = call_site()
+        t0 = time.perf_counter()
+        try:
+            return send(driver_command, params)
+        finally:
+            stats = command_stats.setdefault((driver_command, site), [0, 0.0])
+            stats[0] += 1
+            stats[1] += time.perf_counter() - t0
+            if current_job_id:
+                job_commands[current_job_id] = job_commands.get(current_job_id, 0) + 1
+                job_sites[site] = job_sites.get(site, 0) + 1
+
+    drv.execute = execute
+
+def check_command_budget(job_id, commands):
+    """Flag a job that sent more than MAX_COMMANDS_PER_JOB commands, naming its busiest call sites."""
+    if not MAX_COMMANDS_PER_JOB or commands <= MAX_COMMANDS_PER_JOB:
+        return
+    budget_overruns.append((job_id, commands))
+    sites = ", ".join(f"{site} x{n}" for site, n in sorted(job_sites.items(), key=lambda kv: -kv[1])[:5])
+    logging.error(f"Job {job_id} sent {commands} WebDriver commands (budget {MAX_COMMANDS_PER_JOB}): {sites}")
+    print(f"ERROR: job {job_id} sent {commands} WebDriver commands, over the budget of {MAX_COMMANDS_PER_JOB}")
+
+def command_report(top=TRACE_TOP):
+    """This process's WebDriver commands: totals per command, the top call sites by time, and per-job counts."""
+    if not command_stats:
+        return None
+    total = sum(n for n, _ in command_stats.values())
+    seconds = sum(secs for _, secs in command_stats.values())
+    by_command = {}
+    for (command, _), (n, _) in command_stats.items():
+        by_command[command] = by_command.get(command, 0) + n
+    lines = [
+        f"WebDriver commands (pid {os.getpid()}): {total} sent, {seconds:.1f}s",
+        "  by command: " + ", ".join(f"{c}={n}" for c, n in sorted(by_command.items(), key=lambda kv: -kv[1])),
+        f"  {'call site':<36} {'command':<24} {'count':>6} {'total ms':>9} {'avg ms':>7}",
+    ]
+    for (command, site), (n, secs) in sorted(command_stats.items(), key=lambda kv: -kv[1][1])[:top]:
+        lines.append(f"  {site:<36} {command:<24} {n:>6} {secs * 1000:>9.0f} {secs * 1000 / n:>7.1f}")
+    if job_commands:
+        heaviest = max(job_commands, key=job_commands.get)
+        lines.append(
+            f"  per job: avg {sum(job_commands.values()) / len(job_commands):.1f}, "
+            f"max {job_commands[heaviest]} ({heaviest}) over {len(job_commands)} jobs"
+        )
+    if budget_overruns:
+        lines.append(f"  {len(budget_overruns)} jobs over the budget of {MAX_COMMANDS_PER_JOB}: " + ", ".join(
+            f"{job_id}={n}" for job_id, n in budget_overruns
+        ))
+    return "\n".join(lines)
+
+def log_command_summary():
+    report = command_report()
+    if report:
+        logging.info(report)
+        if TRACE_COMMANDS:
+            print(report)
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round((len(ordered) - 1) * pct)))]
+
+def build_run_report(status_counts):
+    """Summarize this run's spans (all processes): p50/p95 per phase, jobs/minute, time lost to waits."""
+    spans = []
+    with open(SPANS_FILE) as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if rec.get("run") == RUN_ID:
+                spans.append(rec)
+    if not spans:
+        return "No spans recorded for this run."
+    phases = {}
+    for rec in spans:
+        phases.setdefault(rec["phase"], []).append(rec["dur"])
+    run_start = min(rec["start"] for rec in spans)
+    run_end = max(rec["start"] + rec["dur"] for rec in spans)
+    minutes = max(run_end - run_start, 1e-6) / 60
+    jobs = len(phases.get("job", []))
+    waited = sum(sum(durs) for phase, durs in phases.items() if phase.startswith("wait:"))
+    lines = [f"Run report ({RUN_ID}):", f"{'phase':<28} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'total s':>9}"]
+    for phase, durs in sorted(phases.items()):
+        lines.append(
+            f"{phase:<28} {len(durs):>6} {percentile(durs, 0.5) * 1000:>9.0f} "
+            f"{percentile(durs, 0.95) * 1000:>9.0f} {sum(durs):>9.1f}"
+        )
+    lines.append(f"Jobs opened: {jobs} in {minutes:.1f} min ({jobs / minutes:.2f} jobs/min)")
+    lines.append(f"Time in waits: {waited:.1f}s across all processes")
+    commands = [rec["commands"] for rec in spans if rec["phase"] == "job" and "commands" in rec]
+    if commands:
+        lines.append(f"WebDriver commands per job: avg {sum(commands) / len(commands):.1f}, max {max(commands)}")
+        if MAX_COMMANDS_PER_JOB:
+            over = sum(1 for n in commands if n > MAX_COMMANDS_PER_JOB)
+            lines.append(f"Jobs over {MAX_COMMANDS_PER_JOB} commands: {over}")
+    counts = ", ".join(f"{status}={n}" for status, n in status_counts) or "none"
+    lines.append(f"Status counts: {counts}")
+    return "\n".join(lines)
+
+# ---------------- FAILURE ARTIFACTS ----------------
+# A failed job or phase leaves ARTIFACTS_DIR/<time>_<job id>_<phase>_<pid>.zip holding a JPEG screenshot,
+# the page's DOM and this process's recent spans and log lines. Only the capture (two browser calls)
+# runs in the job loop; compressing and writing happen on a background thread, which then deletes the
+# oldest artifacts until the directory fits in ARTIFACTS_MAX_MB.
+ARTIFACTS_DIR = os.getenv("ARTIFACTS_DIR", "artifacts")  # empty disables failure artifacts
+ARTIFACTS_MAX_MB = float(os.getenv("ARTIFACTS_MAX_MB", "50"))  # size budget for ARTIFACTS_DIR
+
+recent_spans = deque(maxlen=50)  # last spans of this process (filled only when SPANS_FILE is set)
+
+class RecentLogHandler(logging.Handler):
+    """Keeps this process's last log lines in memory for failure artifacts."""
+
+    def __init__(self, capacity=100):
+        super().__init__()
+        self.lines = deque(maxlen=capacity)
+
+    def emit(self, record):
+        try:
+            self.lines.append(self.format(record))
+        except Exception:
+            pass
+
+recent_logs = RecentLogHandler()
+recent_logs.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+logging.getLogger().addHandler(recent_logs)
+
+artifact_queue = queue.Queue()
+artifact_writer = None
+
+def capture_failure(phase, job_id=None, error=None):
+    """Snapshot the current page for a failure and queue it to be written. Never raises."""
+    global artifact_writer
+    if not ARTIFACTS_DIR:
+        return
+    job_id = job_id or current_job_id
+    shot, shot_name, url, dom = None, None, None, None
+    try:
+        shot = base64.b64decode(driver.execute_cdp_cmd("Page.captureScreenshot", {"format": "jpeg", "quality": 40})["data"])
+        shot_name = "screenshot.jpg"
+    except Exception:
+        try:
+            shot, shot_name = driver.get_screenshot_as_png(), "screenshot.png"
+        except Exception:
+            pass
+    try:
+        url, dom = driver.execute_script("return [location.href, document.documentElement.outerHTML];")
+    except Exception:
+        pass
+    context = {
+        "run": RUN_ID, "pid": os.getpid(), "phase": phase, "job_id": job_id, "url": url,
+        "error": None if error is None else str(error), "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "spans": list(recent_spans), "log": list(recent_logs.lines),
+    }
+    name = "_".join([time.strftime("%Y%m%d-%H%M%S"), str(job_id or "run"), re.sub(r"\W+", "-", phase), str(os.getpid())])
+    artifact_queue.put((name, shot, shot_name, dom, context))
+    if artifact_writer is None or not artifact_writer.is_alive():
+        artifact_writer = threading.Thread(target=write_artifacts, name="artifact-writer", daemon=True)
+        artifact_writer.start()
+    logging.info(f"Captured failure artifact {name}")
+
+def write_artifacts():
+    """Background thread: write queued captures as zip files, then prune ARTIFACTS_DIR to its budget."""
+    while True:
+        name, shot, shot_name, dom, context = artifact_queue.get()
+        try:
+            os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+            path = os.path.join(ARTIFACTS_DIR, name + ".zip")
+            with zipfile.ZipFile(path + ".tmp", "w", zipfile.ZIP_DEFLATED) as zf:
+                if shot:
+                    zf.writestr(shot_name, shot, compress_type=zipfile.ZIP_STORED)  # already compressed
+                if dom:
+                    zf.writestr("dom.html", dom)
+                zf.writestr("context.json", json.dumps(context, indent=2))
+            os.replace(path + ".tmp", path)
+            prune_artifacts()
+        except Exception as e:
+            logging.warning(f"Could not write failure artifact {name}: {e}")
+        finally:
+            artifact_queue.task_done()
+
+def prune_artifacts():
+    """Delete the oldest artifacts until ARTIFACTS_DIR fits in ARTIFACTS_MAX_MB."""
+    files = []
+    for entry in os.scandir(ARTIFACTS_DIR):
+        if entry.name.endswith(".zip"):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue  # pruned by another process meanwhile
+            files.append((st.st_mtime, st.st_size, entry.path))
+    files.sort()
+    total = sum(size for _, size, _ in files)
+    budget = ARTIFACTS_MAX_MB * 1024 * 1024
+    for _, size, path in files:
+        if total <= budget:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+def flush_artifacts(timeout=15):
+    """Give the writer thread time to finish queued artifacts before the process exits."""
+    deadline = time.monotonic() + timeout
+    while artifact_queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+# ---------------- LEDGER SETUP ----------------
+EXCEL_HEADERS = ["Job ID", "Job Title", "Company", "Salary", "Job Link", "Status"]
+
+def open_ledger(path):
+    """Open (or create) the SQLite ledger in WAL mode. Every record is committed on insert."""
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL,
+            title TEXT,
+            company TEXT,
+            salary TEXT,
+            job_link TEXT,
+            status TEXT,
+            recorded_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_job_id ON jobs(job_id)")
+    # Crawl position of an unfinished run, one row per search query
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS checkpoint (
+            query TEXT PRIMARY KEY,
+            page_num INTEGER NOT NULL,
+            page_url TEXT,
+            visited_pages TEXT NOT NULL DEFAULT '[]',
+            applied_count INTEGER NOT NULL DEFAULT 0,
+            run_id TEXT,
+            updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    """)
+    # Fingerprint (64-bit hash of the normalized card) of every job opened, for repost detection
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            fp INTEGER PRIMARY KEY,
+            job_id TEXT NOT NULL,
+            seen_at INTEGER NOT NULL
+        )
+    """)
+    # Jobs taken by a process of a fan-out run (see claim_job), so no other query opens them
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS claims (
+            job_id TEXT PRIMARY KEY,
+            run_id TEXT NOT NULL,
+            claimed_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    """)
+    # Jobs handed out but not yet recorded; stage is 'queued', 'opened' or 'apply_clicked'
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS in_flight (
+            job_id TEXT PRIMARY KEY,
+            job TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            run_id TEXT,
+            updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    """)
+    # Jobs whose card is counted in the relevance document frequencies (see uncounted_cards)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS relevance_docs (
+            job_id TEXT PRIMARY KEY,
+            counted_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    """)
+    # High-water mark of the last complete incremental crawl, one row per search query
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS watermarks (
+            query TEXT PRIMARY KEY,
+            last_run_at REAL NOT NULL,
+            newest_ids TEXT NOT NULL DEFAULT '[]',
+            updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    """)
+    conn.commit()
+    return conn
+
+def import_excel_history(conn, path):
+    """One-time migration: copy rows from an existing Excel file into an empty ledger."""
+    if conn.execute("SELECT 1 FROM jobs LIMIT 1").fetchone() or not os.path.exists(path):
+        return 0
+    try:
+        src = openpyxl.load_workbook(path, read_only=True)
+    except Exception as e:
+        logging.warning(f"Could not read {path} for ledger import: {e}")
+        return 0
+    rows = []
+    for row in src.active.iter_rows(min_row=2, values_only=True):
+        if row and row[0] is not None:
+            row = (list(row) + [None] * 6)[:6]
+            rows.append([str(row[0])] + row[1:])
+    src.close()
+    with conn:
+        conn.executemany(
+            "INSERT INTO jobs (job_id, title, company, salary, job_link, status) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+    return len(rows)
+
+def export_excel(conn, path):
+    """Stream the whole ledger into a fresh workbook (write-only mode) and atomically replace path."""
+    out = openpyxl.Workbook(write_only=True)
+    ws = out.create_sheet("Applied Jobs")
+    ws.append(EXCEL_HEADERS)
+    for row in conn.execute("SELECT job_id, title, company, salary, job_link, status FROM jobs ORDER BY id"):
+        ws.append(list(row))
+    tmp_path = path + ".tmp"
+    out.save(tmp_path)
+    os.replace(tmp_path, path)
+
+# Set up by main() (coordinator) or init_worker() (worker processes)
+ledger = None
 existing_job_ids = set()
-for row in sheet.iter_rows(min_row=2, values_only=True):
-    if row and row[0] is not None:
-        existing_job_ids.add(str(row[0]))
 
 # ---------------- SELENIUM SETUP ----------------
-options = Options()
-if HEADLESS:
+def build_chrome_options():
     options = Options()
-    options.add_argument("--headless=new")        # modern headless mode
+    if HEADLESS:
+        options = Options()
+        options.add_argument("--headless=new")        # modern headless mode
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--window-size=1920,1080")   # critical
+        options.add_argument("--remote-allow-origins=*") # GitHub Actions fix
+
+    else:
+        options.add_argument("--start-maximized")
+
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--disable-gpu")
     options.add_argument("--disable-extensions")
     options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--window-size=1920,1080")   # critical
-    options.add_argument("--remote-allow-origins=*") # GitHub Actions fix
-
-else:
-    options.add_argument("--start-maximized")
-
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-options.add_argument("--disable-gpu")
-options.add_argument("--disable-extensions")
-options.add_argument("--disable-blink-features=AutomationControlled")
-options.add_argument("--window-size=1920,1080")
-options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                     "AppleWebKit/537.36 (KHTML, like Gecko) "
-                     "Chrome/116.0.5845.140 Safari/537.36")
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option("useAutomationExtension", False)
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option("useAutomationExtension", False)
+    # Lean profile: no background chatter, and no images browser-wide (CDP blocking is per tab)
+    options.add_argument("--disable-background-networking")
+    options.add_argument("--disable-component-update")
+    options.add_argument("--disable-default-apps")
+    options.add_argument("--disable-sync")
+    options.add_argument("--no-first-run")
+    options.add_argument("--mute-audio")
+    if APPLY_CONFIRM:
+        # network events for apply confirmation, read with get_log("performance")
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    if "images" in blocked_categories():
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+# URL patterns for Network.setBlockedURLs, per BLOCK_RESOURCES category
+BLOCK_PATTERNS = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.ogg", "*.m3u8"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "trackers": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+        "*googleadservices.com*", "*adservice.google.*", "*facebook.net*", "*connect.facebook.*",
+        "*hotjar.com*", "*clarity.ms*", "*bat.bing.com*", "*scorecardresearch.com*", "*moengage.com*",
+        "*criteo.*", "*taboola.com*", "*outbrain.com*",
+    ],
+}
+
+def blocked_categories():
+    return [c.strip().lower() for c in BLOCK_RESOURCES.split(",") if c.strip()]
+
+def apply_resource_blocking(categories=None):
+    """
+    Block the configured resource types in the current tab via CDP. Only requests made after the call are
+    blocked, so a new tab needs it before it navigates (see open_in_new_tab).
+    """
+    categories = blocked_categories() if categories is None else categories
+    patterns = [p for c in categories for p in BLOCK_PATTERNS.get(c, [])]
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        logging.debug(f"Resource blocking unavailable: {e}")
+
+def open_in_new_tab(url):
+    """Open url in a new tab and switch to it, with resource blocking installed before its first request."""
+    driver.switch_to.new_window("tab")
+    if blocked_categories():
+        apply_resource_blocking()
+    driver.get(url)
+    return driver.current_window_handle
 
 driver = None
-try:
-    if CHROME_DRIVER_PATH:
-        from selenium.webdriver.chrome.service import Service
-        service = Service(CHROME_DRIVER_PATH)
-        driver = webdriver.Chrome(service=service, options=options)
-    else:
-        driver = webdriver.Chrome(options=options)
-except WebDriverException as e:
-    logging.error(f"Could not start ChromeDriver: {e}")
-    print("ERROR: Could not start ChromeDriver:", e)
-    sys.exit(1)
+wait = None
+actions = None
 
-wait = WebDriverWait(driver, 30)
-actions = ActionChains(driver)
+def start_browser():
+    """Launch Chrome and bind the module-level driver/wait/actions used by every helper."""
+    global driver, wait, actions
+    options = build_chrome_options()
+    try:
+        if CHROME_DRIVER_PATH:
+            from selenium.webdriver.chrome.service import Service
+            service = Service(CHROME_DRIVER_PATH)
+            driver = webdriver.Chrome(service=service, options=options)
+        else:
+            driver = webdriver.Chrome(options=options)
+    except WebDriverException as e:
+        logging.error(f"Could not start ChromeDriver: {e}")
+        print("ERROR: Could not start ChromeDriver:", e)
+        sys.exit(1)
+
+    wait = WebDriverWait(driver, 30)
+    actions = ActionChains(driver)
+    if SPANS_FILE or TRACE_COMMANDS or MAX_COMMANDS_PER_JOB:
+        count_webdriver_commands(driver)
+    if blocked_categories():
+        apply_resource_blocking()
+        logging.info(f"Blocking resources: {', '.join(blocked_categories())}")
+    return driver
+
+# Navigation timing and transfer size of the loaded page
+PAGE_LOAD_METRICS_JS = """
+var nav = performance.getEntriesByType('navigation')[0];
+var res = performance.getEntriesByType('resource');
+var bytes = nav ? nav.transferSize : 0;
+for (var i = 0; i < res.length; i++) { bytes += res[i].transferSize || 0; }
+return {ms: nav ? nav.loadEventEnd - nav.startTime : 0, bytes: bytes, requests: res.length + 1};
+"""
+
+def compare_resource_blocking(urls, runs=3):
+    """
+    Load each URL with and without blocking (cold cache) and print average load time and bytes.
+    Each mode gets its own browser, so the "full" pass also runs without the images-off profile preference,
+    and every load opens a new tab the way detail pages are opened (open_in_new_tab).
+    """
+    global BLOCK_RESOURCES
+    configured = BLOCK_RESOURCES
+    results = {}
+    try:
+        for label, setting in (("full", ""), ("blocked", configured)):
+            BLOCK_RESOURCES = setting
+            start_browser()
+            try:
+                home = driver.current_window_handle
+                driver.execute_cdp_cmd("Network.enable", {})
+                for url in urls:
+                    samples = []
+                    for _ in range(runs):
+                        driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+                        open_in_new_tab(url)
+                        WebDriverWait(driver, 30).until(lambda d: d.execute_script("return document.readyState") == "complete")
+                        samples.append(driver.execute_script(PAGE_LOAD_METRICS_JS))
+                        driver.close()
+                        driver.switch_to.window(home)
+                    results[label, url] = samples
+            finally:
+                driver.quit()
+    finally:
+        BLOCK_RESOURCES = configured
+    print(f"{'mode':<8} {'load ms':>9} {'KB':>9} {'requests':>9}  url")
+    for url in urls:
+        for label in ("full", "blocked"):
+            samples = results[label, url]
+            ms = sum(x["ms"] for x in samples) / runs
+            kb = sum(x["bytes"] for x in samples) / runs / 1024
+            reqs = sum(x["requests"] for x in samples) / runs
+            print(f"{label:<8} {ms:>9.0f} {kb:>9.1f} {reqs:>9.1f}  {url}")
+
+# ---------------- SELECTOR REGISTRY ----------------
+# Every element the bot looks up has a logical name and an ordered chain of strategies: CSS by default,
+# XPath when it starts with "/" or "(", and "text:<regex>" for a visible button/link by its text.
+# A lookup resolves the whole chain in the page in one call and records which strategy hit. Chains are
+# tried best-first by recent hit rate, so the strategy that currently works moves to the front, and the
+# stats persist in SELECTOR_STATS_FILE so the next run starts with the order that worked last.
+SELECTOR_STATS_FILE = os.getenv("SELECTOR_STATS_FILE", "selector_stats.json")  # empty = keep stats in memory only
+SELECTOR_ALERT_RATE = float(os.getenv("SELECTOR_ALERT_RATE", "0.5"))  # warn when an element's recent hit rate drops below this
+SELECTOR_DECAY = 0.2  # weight of the newest lookup in the running hit rates
+
+SELECTORS = {
+    "login_username": ["#usernameField", "input[name='usernameField']", "input[type='email']"],
+    "login_password": ["#passwordField", "input[type='password']"],
+    "login_submit": ["//button[@type='submit']", "text:^\\s*Login\\s*$"],
+    "search_bar": [".nI-gNb-sb__main", "[class*='nI-gNb-sb__main']"],
+    "search_input": [
+        "//input[@placeholder='Enter keyword / designation / companies']",
+        "input.suggestor-input",
+        "input[placeholder*='keyword']",
+    ],
+    "experience_dropdown": ["//div[@class='dropdownMainContainer']", "[class*='dropdownMainContainer']", "#experienceDD"],
+    "experience_option": ["//li[@title='{experience} years']", "//li[normalize-space()='{experience} years']"],
+    "search_button": [
+        "//button[@class='nI-gNb-sb__icon-wrapper']",
+        "button[class*='nI-gNb-sb__icon-wrapper']",
+        "text:^\\s*Search\\s*$",
+    ],
+    "job_card": ["div[class*='srp-jobtuple-wrapper']", "div[class*='jobTuple']", "article[class*='jobTuple']"],
+    "card_title": ["a[class*='title']", "a[class*='jobTitle']"],
+    "card_company": ["a[class*='comp-name']", "a[class*='subTitle']", "[class*='comp-dtls'] a"],
+    "card_salary": ["span[class*='sal-wrap']", "[class*='salary']"],
+    "card_experience": ["span[class*='exp-wrap']", "[class*='experience']"],
+    "card_location": ["span[class*='loc-wrap']", "[class*='location']"],
+    "card_posted": ["span[class*='job-post-day']", "[class*='postedDate']"],
+    "card_snippet": ["[class*='job-desc']", "[class*='job-description']"],
+    "card_tags": ["ul[class*='tags'] li", "[class*='tag-li']"],
+    "apply_status": ["//button[contains(text(),'Apply') or contains(text(),'Applied')]", "text:^\\s*Appl(y|ied)\\b"],
+    "chatbot_send": ["div.sendMsg", "button.sendMsg", ".sendMsg", "text:Next|Submit|Continue"],
+    "page_numbers": ["div.lastCompMark div.styles_pages__v1rAK a", "div[class*='styles_pages'] a"],
+    "next_page": ["//a[contains(text(),'Next') or contains(., 'Next')]", "text:Next"],
+}
+# Elements that are legitimately absent on some pages/cards: no alert when nothing matches.
+OPTIONAL_SELECTORS = {
+    "card_salary", "card_experience", "card_location", "card_posted", "card_snippet", "card_tags",
+    "apply_status", "chatbot_send", "page_numbers", "next_page",
+}
+
+# In-page resolution shared by every lookup. nkResolve(root, chain, all, usable) returns
+# [matches, index of the strategy that hit] or [[], -1]; usable keeps only visible, enabled elements.
+SELECTOR_JS = """
+function nkVisible(el) { return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length); }
+function nkFind(root, s, all, usable) {
+    var els = [];
+    if (s.indexOf('text:') === 0) {
+        var re = new RegExp(s.slice(5)), cand = root.querySelectorAll('button, a');
+        for (var i = 0; i < cand.length; i++) {
+            if (re.test(cand[i].innerText || '') && nkVisible(cand[i])) { els.push(cand[i]); }
+        }
+    } else if (s[0] === '/' || s[0] === '(') {
+        var snap = document.evaluate(s, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < snap.snapshotLength; i++) { els.push(snap.snapshotItem(i)); }
+    } else {
+        els = Array.prototype.slice.call(root.querySelectorAll(s));
+    }
+    if (usable) { els = els.filter(function (el) { return nkVisible(el) && !el.disabled; }); }
+    return all ? els : els.slice(0, 1);
+}
+function nkResolve(root, chain, all, usable) {
+    for (var i = 0; i < chain.length; i++) {
+        var found = nkFind(root, chain[i], all, usable);
+        if (found.length) { return [found, i]; }
+    }
+    return [[], -1];
+}
+"""
+
+RESOLVE_JS = SELECTOR_JS + """
+return nkResolve(arguments[0] || document, arguments[1], arguments[2], arguments[3]);
+"""
+
+class SelectorRegistry:
+    """
+    Ordered strategy chains per logical element, with per-strategy hits/misses and running hit rates.
+    Strategies tried before the one that hit count as misses; a lookup where nothing matched says nothing
+    about the order and only counts against the element's own hit rate.
+    """
+
+    def __init__(self, chains, path):
+        self.declared = chains
+        self.path = path
+        stats = self.read()
+        self.strategies = stats["strategies"]  # name -> strategy -> {"hits", "misses", "score"}
+        self.elements = stats["elements"]  # name -> {"lookups", "found", "rate"}
+        self.new_strategies = {}  # (name, strategy) -> [hits, misses] not yet saved
+        self.new_elements = {}  # name -> [lookups, found] not yet saved
+        self.alerted = set()
+
+    def read(self):
+        stats = {"strategies": {}, "elements": {}}
+        if not self.path or not os.path.exists(self.path):
+            return stats
+        try:
+            with open(self.path) as f:
+                stats.update(json.load(f))
+        except Exception as e:
+            logging.warning(f"Could not read selector stats {self.path}: {e}")
+        return stats
+
+    def chain(self, name):
+        """The element's strategies, best recent hit rate first; declared order breaks ties."""
+        stats = self.strategies.get(name, {})
+        return sorted(self.declared[name], key=lambda s: -stats.get(s, {}).get("score", 0.5))
+
+    def record(self, name, chain, hit):
+        """Record one lookup of name through chain, where hit is the index that matched or -1."""
+        counts = [0] * (len(chain) + 1)
+        counts[hit] = 1
+        self.record_counts(name, chain, counts)
+
+    def record_counts(self, name, chain, counts):
+        """
+        Record a batch of lookups: counts[i] hits on chain[i], counts[-1] lookups where nothing matched.
+        Running rates move once per batch, by the batch's own rate, so a page of cards weighs like one lookup.
+        """
+        stats = self.strategies.setdefault(name, {})
+        for i, strategy in enumerate(chain):
+            hits = counts[i]
+            misses = sum(counts[i + 1:-1])  # lookups that fell through strategy i to a later one
+            if not hits and not misses:
+                continue
+            entry = stats.setdefault(strategy, {"hits": 0, "misses": 0, "score": 0.5})
+            entry["hits"] += hits
+            entry["misses"] += misses
+            entry["score"] = (1 - SELECTOR_DECAY) * entry["score"] + SELECTOR_DECAY * hits / (hits + misses)
+            pending = self.new_strategies.setdefault((name, strategy), [0, 0])
+            pending[0] += hits
+            pending[1] += misses
+
+        lookups = sum(counts)
+        found = lookups - counts[-1]
+        if not lookups:
+            return
+        element = self.elements.setdefault(name, {"lookups": 0, "found": 0, "rate": 1.0})
+        element["lookups"] += lookups
+        element["found"] += found
+        element["rate"] = (1 - SELECTOR_DECAY) * element["rate"] + SELECTOR_DECAY * found / lookups
+        pending = self.new_elements.setdefault(name, [0, 0])
+        pending[0] += lookups
+        pending[1] += found
+        if name in OPTIONAL_SELECTORS:
+            return
+        if element["rate"] < SELECTOR_ALERT_RATE and name not in self.alerted:
+            self.alerted.add(name)
+            rates = ", ".join(f"{s!r} {stats.get(s, {}).get('score', 0.5):.0%}" for s in self.chain(name))
+            logging.warning(
+                f"Selector '{name}': hit rate collapsed to {element['rate']:.0%}; the page markup may have "
+                f"changed. Strategy hit rates: {rates}"
+            )
+            print(f"Warning: selector '{name}' stopped matching; see naukri_log.txt")
+        elif element["rate"] >= SELECTOR_ALERT_RATE:
+            self.alerted.discard(name)
+
+    def add_new_counts(self, on_disk, _):
+        merged = {"strategies": {}, "elements": {}, **on_disk}
+        for (name, strategy), (hits, misses) in self.new_strategies.items():
+            entry = merged["strategies"].setdefault(name, {}).setdefault(strategy, {"hits": 0, "misses": 0})
+            entry["hits"] += hits
+            entry["misses"] += misses
+            entry["score"] = round(self.strategies[name][strategy]["score"], 4)
+        for name, (lookups, found) in self.new_elements.items():
+            entry = merged["elements"].setdefault(name, {"lookups": 0, "found": 0})
+            entry["lookups"] += lookups
+            entry["found"] += found
+            entry["rate"] = round(self.elements[name]["rate"], 4)
+        return merged
+
+    def save(self):
+        """Add this process's unsaved counts to the file on disk (other processes share it) and replace it atomically."""
+        if not self.path or not self.new_elements:
+            return
+        try:
+            atomic_json_merge(self.path, None, self.add_new_counts, indent=1, sort_keys=True)
+            self.new_strategies.clear()
+            self.new_elements.clear()
+        except Exception as e:
+            logging.warning(f"Could not save selector stats: {e}")
+
+selector_registry = SelectorRegistry(SELECTORS, SELECTOR_STATS_FILE)
+
+def strategies_for(name, fmt):
+    chain = selector_registry.chain(name)
+    return chain, ([s.format(**fmt) for s in chain] if fmt else chain)
+
+def locate(name, root=None, all=False, usable=False, **fmt):
+    """
+    Resolve a logical element through its chain in one call and record which strategy hit.
+    Returns the first match (every match with all=True), or None / [] when nothing matched.
+    Keyword arguments fill placeholders in the strategies, e.g. locate("experience_option", experience="5").
+    """
+    chain, strategies = strategies_for(name, fmt)
+    try:
+        found, hit = driver.execute_script(RESOLVE_JS, root, strategies, all, usable)
+    except WebDriverException as e:
+        logging.warning(f"Lookup of '{name}' failed: {e}")
+        return [] if all else None
+    selector_registry.record(name, chain, hit)
+    if all:
+        return found
+    return found[0] if found else None
+
+def wait_for_element(name, timeout=10, usable=True, required=False, **fmt):
+    """
+    Wait until a logical element resolves (visible and enabled unless usable=False) and return it, or None.
+    Only the final outcome is recorded, not every poll. required=True raises TimeoutException instead of returning None.
+    """
+    chain, strategies = strategies_for(name, fmt)
+    result = {"hit": -1}
+
+    def resolved(d):
+        found, result["hit"] = d.execute_script(RESOLVE_JS, None, strategies, False, usable)
+        result["element"] = found[0] if found else None
+        return bool(found)
+
+    wait_for("element", resolved, timeout=timeout)
+    selector_registry.record(name, chain, result["hit"])
+    if required and result.get("element") is None:
+        raise TimeoutException(f"Element '{name}' not found")
+    return result.get("element")
+
+def selector_css(name):
+    """The element's CSS strategies joined into one selector list, for scripts that only need any match."""
+    return ", ".join(s for s in selector_registry.chain(name) if s[0] not in "/(" and not s.startswith("text:"))
+
+def log_selector_summary():
+    for name, (lookups, found) in sorted(selector_registry.new_elements.items()):
+        chain = selector_registry.chain(name)
+        moved = f" (declared #{SELECTORS[name].index(chain[0]) + 1})" if chain[0] != SELECTORS[name][0] else ""
+        logging.info(
+            f"Selector '{name}': {found}/{lookups} found, recent hit rate "
+            f"{selector_registry.elements[name]['rate']:.0%}, leading strategy {chain[0]!r}{moved}"
+        )
+
+# ---------------- WAIT ENGINE ----------------
+
+# True once the element matched by arguments[0] (body if null) is gone/hidden, or has had no DOM
+# mutations for arguments[1] ms. A MutationObserver tracks the changes.
+DOM_IDLE_JS = """
+var el = arguments[0] ? document.querySelector(arguments[0]) : document.body;
+if (!el || !(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) { return true; }
+if (!el.__nkObserver) {
+    el.__nkLast = Date.now();
+    el.__nkObserver = new MutationObserver(function () { el.__nkLast = Date.now(); });
+    el.__nkObserver.observe(el, {childList: true, subtree: true, characterData: true, attributes: true});
+}
+return Date.now() - el.__nkLast >= arguments[1];
+"""
+
+RESULTS_READY_JS = """
+if (document.readyState !== 'complete') { return false; }
+var card = document.querySelector(arguments[0]);
+if (!card) { return false; }
+var list = card.parentElement;
+if (!list.__nkObserver) {
+    list.__nkLast = Date.now();
+    list.__nkObserver = new MutationObserver(function () { list.__nkLast = Date.now(); });
+    list.__nkObserver.observe(list, {childList: true, subtree: true});
+}
+return Date.now() - list.__nkLast >= arguments[1];
+"""
+
+# First visible, enabled button/link (document order, like //button|//a) whose text mentions "apply".
+# Returns [element, lowercased text] or null, so the detail page costs one round trip.
+APPLY_BUTTON_JS = """
+var els = document.querySelectorAll('button, a');
+for (var i = 0; i < els.length; i++) {
+    var el = els[i];
+    var t = (el.innerText || '').trim().toLowerCase();
+    if (t.indexOf('apply') === -1 || el.disabled || el.getAttribute('aria-disabled') === 'true') { continue; }
+    if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) { continue; }
+    if (window.getComputedStyle(el).visibility === 'hidden') { continue; }
+    return [el, t];
+}
+return null;
+"""
+
+LOGGED_IN_JS = """
+return document.readyState === 'complete'
+    && !document.getElementById('usernameField')
+    && !!document.querySelector('.nI-gNb-sb__main');
+"""
+
+CHATBOT_VISIBLE_JS = """
+var el = document.querySelector('.chatbot_DrawerContentWrapper');
+return !!(el && (el.offsetWidth || el.offsetHeight || el.getClientRects().length));
+"""
+
+APPLIED_LABEL_JS = """
+var els = document.querySelectorAll('button, span');
+for (var i = 0; i < els.length; i++) {
+    var t = (els[i].innerText || '').trim().toLowerCase();
+    if (t === 'applied' && (els[i].offsetWidth || els[i].offsetHeight)) { return true; }
+}
+return false;
+"""
+
+# Named readiness conditions: each factory takes the wait's arguments and returns a predicate on the driver.
+WAIT_CONDITIONS = {
+    "login_done": lambda: lambda d: "nlogin" not in d.current_url,
+    "logged_in": lambda: lambda d: "nlogin" not in d.current_url and d.execute_script(LOGGED_IN_JS),
+    "url_changed": lambda old_url: lambda d: d.current_url != old_url,
+    "new_tab": lambda handle_count: lambda d: len(d.window_handles) > handle_count,
+    "results_rendered": lambda: lambda d: d.execute_script(RESULTS_READY_JS, selector_css("job_card"), 300),
+    "detail_ready": lambda: lambda d: d.execute_script("return document.readyState") == "complete" and (
+        d.execute_script(APPLY_BUTTON_JS) or d.execute_script(DOM_IDLE_JS, None, 800)
+    ),
+    "apply_response": lambda watch: lambda d: watch.poll() or d.execute_script(CHATBOT_VISIBLE_JS),
+    "apply_confirmed": lambda watch: lambda d: watch.poll(),
+    "apply_settled": lambda: lambda d: (
+        d.execute_script(CHATBOT_VISIBLE_JS)
+        or d.execute_script(APPLIED_LABEL_JS)
+        or d.execute_script(DOM_IDLE_JS, None, 1000)
+    ),
+    "chatbot_idle": lambda: lambda d: d.execute_script(DOM_IDLE_JS, ".chatbot_DrawerContentWrapper", 400),
+    "chatbot_turn": lambda question: lambda d: d.execute_script(CHATBOT_NEXT_TURN_JS, question),
+    "clickable": lambda element: lambda d: element.is_displayed() and element.is_enabled(),
+    "element": lambda predicate: predicate,
+}
+
+# name -> [count, total seconds, max seconds, timeouts]
+wait_stats = {}
+
+def wait_for(name, *args, timeout=10):
+    """
+    Block until the named readiness condition holds or timeout expires, and record how long it took.
+    Returns True if the condition was met, False on timeout.
+    """
+    condition = WAIT_CONDITIONS[name](*args)
+    start = time.monotonic()
+    met = True
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL).until(condition)
+    except TimeoutException:
+        met = False
+    elapsed = time.monotonic() - start
+    if SPANS_FILE:
+        record_span(f"wait:{name}", time.time() - elapsed, elapsed, current_job_id, "met" if met else "timeout")
+    stats = wait_stats.setdefault(name, [0, 0.0, 0.0, 0])
+    stats[0] += 1
+    stats[1] += elapsed
+    stats[2] = max(stats[2], elapsed)
+    if not met:
+        stats[3] += 1
+        logging.info(f"Wait '{name}' timed out after {elapsed:.2f}s")
+    else:
+        logging.debug(f"Wait '{name}' met in {elapsed:.3f}s")
+    return met
+
+def log_wait_summary():
+    for name, (count, total, longest, timeouts) in sorted(wait_stats.items()):
+        logging.info(
+            f"Wait '{name}': {count} waits, {total:.1f}s total, avg {total / count:.2f}s, "
+            f"max {longest:.2f}s, {timeouts} timeouts"
+        )
+
+# ---------------- PACING ----------------
+# Browser actions (opening a job, clicking Apply, answering the chatbot, changing page) draw from a
+# token bucket whose rate adapts AIMD-style: +PACE_STEP actions/s after each healthy page load, times
+# PACE_BACKOFF after a slow load or an error page, and straight down to PACE_MIN_RATE on a captcha or a
+# redirect to login. The rate is per process; the end-of-run log and the "pace" spans show it.
+PACE_MAX_RATE = float(os.getenv("PACE_MAX_RATE", "4"))  # actions per second; 0 disables pacing
+PACE_MIN_RATE = float(os.getenv("PACE_MIN_RATE", "0.2"))
+PACE_START_RATE = float(os.getenv("PACE_START_RATE", "1"))
+PACE_STEP = float(os.getenv("PACE_STEP", "0.1"))  # additive increase per healthy page
+PACE_BACKOFF = float(os.getenv("PACE_BACKOFF", "0.5"))  # multiplicative decrease on trouble
+PACE_SLOW_LOAD = float(os.getenv("PACE_SLOW_LOAD", "8"))  # seconds; slower page loads count as trouble
+
+# Classifies the current page: 'login' (session lost), 'captcha', 'error' (throttled / error page) or 'ok'.
+PAGE_HEALTH_JS = """
+if (location.pathname.indexOf('nlogin') !== -1) { return 'login'; }
+var title = (document.title || '').toLowerCase();
+var text = document.body ? document.body.textContent.slice(0, 3000).toLowerCase() : '';
+if (document.querySelector("iframe[src*='captcha'], .g-recaptcha, #captcha")
+        || /captcha|are you a robot|unusual traffic/.test(title + ' ' + text)) { return 'captcha'; }
+if (/too many requests|access denied|service unavailable|bad gateway|\\b(403|429|500|502|503)\\b/.test(title)) { return 'error'; }
+return 'ok';
+"""
+
+class PaceController:
+    """Token bucket (bursts of up to `burst` actions) whose refill rate is adjusted by observe()."""
+
+    def __init__(self, rate, min_rate, max_rate, burst=2):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lowest = self.rate
+        self.actions = 0
+        self.waited = 0.0
+        self.backoffs = {}  # reason -> count
+
+    def acquire(self):
+        """Block until the next action is allowed; returns the seconds waited."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        delay = 0.0
+        if self.tokens < 1:
+            delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            self.tokens = 1
+            self.updated = time.monotonic()
+        self.tokens -= 1
+        self.actions += 1
+        self.waited += delay
+        return delay
+
+    def observe(self, health, load_seconds=None):
+        """Adjust the rate after a page load: health as from PAGE_HEALTH_JS, load_seconds if measured."""
+        if health == "ok" and (load_seconds is None or load_seconds < PACE_SLOW_LOAD):
+            self.rate = min(self.max_rate, self.rate + PACE_STEP)
+            return
+        reason = "slow" if health == "ok" else health
+        old = self.rate
+        if health in ("captcha", "login"):
+            self.rate = self.min_rate
+        else:
+            self.rate = max(self.min_rate, self.rate * PACE_BACKOFF)
+        self.tokens = 0  # no burst right after trouble
+        self.lowest = min(self.lowest, self.rate)
+        self.backoffs[reason] = self.backoffs.get(reason, 0) + 1
+        logging.warning(f"Pacing: {reason} page, rate {old:.2f} -> {self.rate:.2f} actions/s")
+
+pacer = PaceController(PACE_START_RATE, PACE_MIN_RATE, PACE_MAX_RATE) if PACE_MAX_RATE > 0 else None
+
+def pace(action):
+    """Wait for the pacing controller before a browser action."""
+    if pacer is None:
+        return
+    with span("pace") as pace_span:
+        pace_span["outcome"] = action
+        pace_span["rate"] = round(pacer.rate, 3)
+        pacer.acquire()
+
+def check_page_health(load_seconds=None):
+    """Classify the page just loaded and feed it to the pacing controller (if pacing is on). Returns the health."""
+    try:
+        health = driver.execute_script(PAGE_HEALTH_JS) or "ok"
+    except WebDriverException:
+        health = "error"
+    if pacer:
+        pacer.observe(health, load_seconds)
+    return health
+
+def log_pace_summary():
+    if pacer is None or not pacer.actions:
+        return
+    logging.info(
+        f"Pacing: {pacer.actions} actions, {pacer.waited:.1f}s waited, rate now {pacer.rate:.2f}/s "
+        f"(lowest {pacer.lowest:.2f}/s), backoffs: {pacer.backoffs}"
+    )
 
 # ---------------- HELPERS ----------------
 def safe_click(element, timeout=10):
     """Scroll to element, wait until it is clickable, then click via ActionChains."""
     try:
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-        end = time.time() + timeout
-        while time.time() < end:
-            try:
-                if element.is_displayed() and element.is_enabled():
-                    break
-            except StaleElementReferenceException:
-                return False
-            time.sleep(0.12)
-        actions.move_to_element(element).pause(0.12).click().perform()
+        try:
+            wait_for("clickable", element, timeout=timeout)
+        except StaleElementReferenceException:
+            return False
+        actions.move_to_element(element).click().perform()
         return True
     except (ElementClickInterceptedException, ElementNotInteractableException, StaleElementReferenceException, Exception) as exc:
         logging.warning(f"safe_click failed: {exc}")
         return False
 
-def parse_max_salary(salary_text):
-    """Try to extract a numeric maximum salary in LPA from salary_text. Returns float or None."""
-    if not salary_text:
-        return None
-    s = salary_text.lower()
-    if "not disclose" in s or "not disclosed" in s:
-        return None
-    # normalize many common variants
-    s = s.replace("lacs pa", "lpa").replace("lacs", "lpa").replace("per annum", "").replace("p.a.", "").replace("pa", "")
-    nums = re.findall(r"[\d\.]+", s)
-    if not nums:
-        return None
+# Shared prefix: the card list through the job_card chain (arguments[0]), preferring cards inside the
+# chatbot wrapper when present.
+CARD_LIST_JS = SELECTOR_JS + """
+var root = document.querySelector('.chatbot_DrawerContentWrapper');
+var listed = root ? nkResolve(root, arguments[0], true) : [[], -1];
+if (!listed[0].length) { listed = nkResolve(document, arguments[0], true); }
+var cards = listed[0];
+"""
+
+# Runs in the page: collects every job card's fields in a single round trip. arguments[1] maps each field
+# to its strategy chain; hits[field][i] counts cards where strategy i matched, the last slot cards with no match.
+CARD_EXTRACT_JS = CARD_LIST_JS + """
+function text(el) { return el ? (el.innerText || el.textContent || '').trim() : ''; }
+var fields = arguments[1], hits = {};
+for (var f in fields) { hits[f] = fields[f].map(function () { return 0; }).concat([0]); }
+function field(card, f, all) {
+    var r = nkResolve(card, fields[f], all);
+    hits[f][r[1] < 0 ? fields[f].length : r[1]]++;
+    return all ? r[0] : (r[0][0] || null);
+}
+var out = [];
+for (var i = 0; i < cards.length; i++) {
+    var card = cards[i];
+    var titleEl = field(card, 'title');
+    var tagEls = field(card, 'tags', true);
+    var tags = [];
+    for (var j = 0; j < tagEls.length; j++) { if (text(tagEls[j])) { tags.push(text(tagEls[j])); } }
+    var applied = false;
+    var spans = card.querySelectorAll('span');
+    for (var j = 0; j < spans.length; j++) {
+        var own = '';
+        for (var k = 0; k < spans[j].childNodes.length; k++) {
+            if (spans[j].childNodes[k].nodeType === 3) { own += spans[j].childNodes[k].nodeValue; }
+        }
+        if (own.indexOf('Applied') !== -1 && nkVisible(spans[j])) { applied = true; break; }
+    }
+    out.push({
+        index: i,
+        job_id: card.getAttribute('data-job-id'),
+        title: titleEl ? text(titleEl) : null,
+        link: titleEl ? (titleEl.href || null) : null,
+        company: text(field(card, 'company')) || null,
+        salary: text(field(card, 'salary')) || null,
+        experience: text(field(card, 'experience')) || null,
+        location: text(field(card, 'location')) || null,
+        posted: text(field(card, 'posted')) || null,
+        snippet: text(field(card, 'snippet')) || null,
+        tags: tags,
+        applied: applied
+    });
+}
+return {cards: out, card_hit: listed[1], hits: hits};
+"""
+
+# Resolves the live title link of one card, matching on data-job-id and falling back to the index.
+CARD_TITLE_JS = CARD_LIST_JS + """
+var card = null;
+for (var i = 0; i < cards.length; i++) {
+    if (cards[i].getAttribute('data-job-id') === arguments[1]) { card = cards[i]; break; }
+}
+if (!card && arguments[2] < cards.length) { card = cards[arguments[2]]; }
+return card ? (nkResolve(card, arguments[3], false)[0][0] || null) : null;
+"""
+
+# Card record field -> logical element in SELECTORS
+CARD_FIELDS = {
+    "title": "card_title",
+    "company": "card_company",
+    "salary": "card_salary",
+    "experience": "card_experience",
+    "location": "card_location",
+    "posted": "card_posted",
+    "snippet": "card_snippet",
+    "tags": "card_tags",
+}
+
+def extract_job_cards():
+    """Return plain dict records (job_id, title, link, company, salary, experience, ..., applied) for every card on the page."""
+    card_chain = selector_registry.chain("job_card")
+    field_chains = {field: selector_registry.chain(name) for field, name in CARD_FIELDS.items()}
     try:
-        val = float(nums[-1])
-        return val
-    except Exception:
+        result = driver.execute_script(CARD_EXTRACT_JS, card_chain, field_chains)
+    except WebDriverException as e:
+        logging.warning(f"Card extraction failed: {e}")
+        return []
+    selector_registry.record("job_card", card_chain, result["card_hit"])
+    for field, counts in result["hits"].items():
+        selector_registry.record_counts(CARD_FIELDS[field], field_chains[field], counts)
+    return result["cards"]
+
+def find_card_title(card):
+    """Look up the live title element for a card record, or None."""
+    try:
+        return driver.execute_script(
+            CARD_TITLE_JS, selector_registry.chain("job_card"), card["job_id"], card["index"],
+            selector_registry.chain("card_title"),
+        )
+    except WebDriverException:
         return None
 
+def find_apply_button():
+    """
+    Classify the detail page's apply control in a single in-page call.
+    Returns (element, kind) with kind "apply", "applied" or "company_site", or (None, None) if there is none.
+    """
+    try:
+        found = driver.execute_script(APPLY_BUTTON_JS)
+    except WebDriverException as e:
+        logging.warning(f"Apply button lookup failed: {e}")
+        return None, None
+    if not found:
+        return None, None
+    element, btn_text = found
+    if "company site" in btn_text or "apply on company" in btn_text:
+        return element, "company_site"
+    if "applied" in btn_text:
+        return element, "applied"
+    return element, "apply"
+
 def save_record(job_id, title, company, salary_text, job_link, status):
-    """Append a row to Excel and save immediately, and mark job id as processed."""
+    """Append a row to the ledger (committed immediately), and mark job id as processed."""
     try:
-        sheet.append([str(job_id), title, company, salary_text, job_link, status])
-        wb.save(EXCEL_FILE)
+        with ledger:
+            ledger.execute(
+                "INSERT INTO jobs (job_id, title, company, salary, job_link, status) VALUES (?, ?, ?, ?, ?, ?)",
+                (str(job_id), title, company, salary_text, job_link, status),
+            )
     except Exception as e:
-        logging.error(f"Failed to write to Excel: {e}")
+        logging.error(f"Failed to write to ledger: {e}")
     existing_job_ids.add(str(job_id))
 
-# ---------------- CHATBOT ANSWERING FUNCTION ----------------
+# ---------------- CHATBOT ANSWERING ----------------
+# Answers come from a profile (PROFILE_FILE, JSON) and fall back to TEXT_VALUE_FOR_BOT.
+# Answers the bot accepted are memoized per normalized question in CHATBOT_CACHE_FILE.
+DEFAULT_PROFILE = {
+    "total_experience": None,  # None = the active EXPERIENCE setting
+    "skill_experience": {},  # e.g. {"java": 11, "spring boot": 8}
+    "notice_period": None,  # e.g. "30 days"
+    "current_ctc": None,  # e.g. "30 LPA"
+    "expected_ctc": None,
+    "current_location": None,
+    "preferred_location": None,
+    "default_yes_no": "Yes",
+}
+
+def load_chatbot_profile():
+    """PROFILE_FILE over DEFAULT_PROFILE, for the current settings (reloaded per daemon request)."""
+    profile = dict(DEFAULT_PROFILE)
+    if PROFILE_FILE and os.path.exists(PROFILE_FILE):
+        try:
+            with open(PROFILE_FILE) as f:
+                profile.update(json.load(f))
+        except Exception as e:
+            logging.warning(f"Could not read chatbot profile {PROFILE_FILE}: {e}")
+    if profile["total_experience"] is None:
+        profile["total_experience"] = EXPERIENCE
+    profile["skill_experience"] = {k.lower(): v for k, v in (profile.get("skill_experience") or {}).items()}
+    return profile
+
+def load_answer_cache():
+    if not CHATBOT_CACHE_FILE or not os.path.exists(CHATBOT_CACHE_FILE):
+        return {}
+    try:
+        with open(CHATBOT_CACHE_FILE) as f:
+            return json.load(f)
+    except Exception as e:
+        logging.warning(f"Could not read chatbot answer cache {CHATBOT_CACHE_FILE}: {e}")
+        return {}
+
+def save_answer_cache():
+    """Merge with the file on disk (other processes may have added answers) and replace it atomically."""
+    if not CHATBOT_CACHE_FILE:
+        return
+    try:
+        atomic_json_merge(CHATBOT_CACHE_FILE, answer_cache, lambda on_disk, new: {**on_disk, **new},
+                          indent=1, sort_keys=True)
+    except Exception as e:
+        logging.warning(f"Could not save chatbot answer cache: {e}")
+
+chatbot_profile = load_chatbot_profile()
+answer_cache = load_answer_cache()
+chatbot_stats = {"chatbots": 0, "handled": 0, "turns": 0, "cache_hits": 0, "rejected": 0, "categories": {}}
+
+AUX_VERB_RE = re.compile(r"^(are|do|did|is|have|has|can|could|will|would|should|were)\b")
+QUESTION_RULES = [
+    ("notice_period", re.compile(r"notice|how soon|earliest.*join|joining date")),
+    ("expected_ctc", re.compile(r"expect\w*.{0,40}(ctc|salary|package|compensation)|(ctc|salary|package|compensation).{0,40}expect")),
+    ("current_ctc", re.compile(r"\bctc\b|salary|package|compensation")),
+    ("skill_years", re.compile(r"how many|years|yrs|experience")),
+    ("location", re.compile(r"location|city|located|based (in|out|at)|residing|where")),
+]
+
+def normalize_question(question):
+    return " ".join(re.sub(r"[^\w\s]", " ", (question or "").lower()).split())
+
+def classify_question(question):
+    q = normalize_question(question)
+    if AUX_VERB_RE.match(q) and "how many" not in q:
+        return "yes_no"
+    for category, pattern in QUESTION_RULES:
+        if pattern.search(q):
+            return category
+    return "other"
+
+def profile_answer(category, question):
+    """Answer for a classified question from the profile, or None if the profile has nothing for it."""
+    p = chatbot_profile
+    if category == "skill_years":
+        q = normalize_question(question)
+        for skill in sorted(p["skill_experience"], key=len, reverse=True):
+            if skill in q:
+                return str(p["skill_experience"][skill])
+        return str(p["total_experience"]) if p.get("total_experience") else None
+    if category == "yes_no":
+        return p.get("default_yes_no")
+    if category == "location":
+        return p.get("current_location") or p.get("preferred_location")
+    value = p.get(category)
+    return str(value) if value else None
+
+def option_numbers(text, category):
+    """Numbers in an answer/option; notice periods are compared in days ("1 month" -> 30)."""
+    if category == "notice_period":
+        text = re.sub(r"(\d+(?:\.\d+)?)\s*months?", lambda m: str(float(m.group(1)) * 30), text)
+    return [float(x) for x in re.findall(r"\d+(?:\.\d+)?", text)]
+
+def pick_option(answer, options, category):
+    """Choose the option that best matches answer: exact, then substring, then numeric range, else the first."""
+    if not options:
+        return None
+    a = (answer or "").strip().lower()
+    lowered = [o.strip().lower() for o in options]
+    if a:
+        for i, o in enumerate(lowered):
+            if o == a:
+                return options[i]
+        for i, o in enumerate(lowered):
+            if o and (a in o or o in a):
+                return options[i]
+    if category == "yes_no":
+        want = "no" if a.startswith("no") else "yes"
+        for i, o in enumerate(lowered):
+            if o.startswith(want):
+                return options[i]
+    nums = option_numbers(a, category)
+    if nums:
+        n = nums[0]
+        best, best_gap = None, None
+        for i, o in enumerate(lowered):
+            bounds = option_numbers(o, category)
+            if not bounds:
+                continue
+            if len(bounds) >= 2 and bounds[0] <= n <= bounds[1]:
+                return options[i]
+            gap = abs(bounds[0] - n)
+            if best_gap is None or gap < best_gap:
+                best, best_gap = options[i], gap
+        if best is not None:
+            return best
+    return options[0]
+
+def resolve_answer(question, options, retry=False):
+    """
+    Return (answer, source) for a question: profile answer, cached answer, or the fallback text.
+    The profile goes first so a run's own settings (e.g. a daemon request's experience) win over answers
+    cached by earlier runs.
+    """
+    key = normalize_question(question)
+    category = classify_question(question)
+    answer = None if retry else profile_answer(category, question)
+    if answer:
+        source = category
+    elif not retry and key in answer_cache:
+        chatbot_stats["cache_hits"] += 1
+        answer, source = answer_cache[key], "cache"
+    else:
+        answer, source = TEXT_VALUE_FOR_BOT or "", "fallback"
+    chatbot_stats["categories"][category] = chatbot_stats["categories"].get(category, 0) + 1
+    if options:
+        answer = pick_option(answer, options, category)
+    return answer, source
+
+# Shared prefix: the drawer (root) and the text of the latest bot message.
+CHATBOT_QUESTION_JS = """
+var root = document.querySelector('.chatbot_DrawerContentWrapper');
+function visible(el) { return !!(el && (el.offsetWidth || el.offsetHeight || el.getClientRects().length)); }
+function lastQuestion() {
+    var msgs = root.querySelectorAll("[class*='botMsg'], li[class*='botItem']");
+    for (var i = msgs.length - 1; i >= 0; i--) {
+        var t = (msgs[i].innerText || '').trim();
+        if (t) { return t; }
+    }
+    return '';
+}
+"""
+
+# One call per turn: the latest question plus the options of any radio/checkbox/chip/select controls.
+CHATBOT_TURN_JS = CHATBOT_QUESTION_JS + """
+if (!visible(root)) { return null; }
+var options = [];
+var boxes = root.querySelectorAll("input[type='radio'], input[type='checkbox']");
+for (var i = 0; i < boxes.length; i++) {
+    var lbl = (boxes[i].labels && boxes[i].labels[0]) || boxes[i].parentElement;
+    var t = lbl ? (lbl.innerText || '').trim() : '';
+    if (t) { options.push(t); }
+}
+var chips = root.querySelectorAll("[class*='chatbot_Chip'], [class*='chipItem']");
+for (var i = 0; i < chips.length; i++) {
+    var t = (chips[i].innerText || '').trim();
+    if (t && visible(chips[i])) { options.push(t); }
+}
+var sels = root.querySelectorAll('select');
+for (var i = 0; i < sels.length; i++) {
+    if (!visible(sels[i])) { continue; }
+    for (var j = 0; j < sels[i].options.length; j++) {
+        var t = (sels[i].options[j].text || '').trim();
+        if (t) { options.push(t); }
+    }
+}
+return {question: lastQuestion(), options: options};
+"""
+
+# One call per turn: fill every field with arguments[0], pick the control labelled arguments[1],
+# then click the first usable send control from the chatbot_send chain (arguments[2]).
+CHATBOT_FILL_JS = CHATBOT_QUESTION_JS + SELECTOR_JS + """
+var answer = arguments[0], choice = (arguments[1] || '').trim().toLowerCase();
+if (!visible(root)) { return {filled: 0, sent: false}; }
+var filled = 0;
+function setValue(el, v) {
+    var proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, v);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+var texts = root.querySelectorAll("input:not([type]), input[type='text'], input[type='number'], textarea");
+for (var i = 0; i < texts.length; i++) {
+    if (visible(texts[i]) && !texts[i].disabled) { setValue(texts[i], answer); filled++; }
+}
+var editables = root.querySelectorAll("div[contenteditable='true'], div[contenteditable='']");
+for (var i = 0; i < editables.length; i++) {
+    if (!visible(editables[i])) { continue; }
+    editables[i].focus();
+    editables[i].innerText = answer;
+    editables[i].dispatchEvent(new Event('input', {bubbles: true}));
+    filled++;
+}
+if (choice) {
+    var picked = false;
+    var boxes = root.querySelectorAll("input[type='radio'], input[type='checkbox']");
+    for (var i = 0; i < boxes.length && !picked; i++) {
+        var lbl = (boxes[i].labels && boxes[i].labels[0]) || boxes[i].parentElement;
+        if (lbl && (lbl.innerText || '').trim().toLowerCase() === choice) {
+            (visible(boxes[i]) ? boxes[i] : lbl).click(); picked = true; filled++;
+        }
+    }
+    var chips = root.querySelectorAll("[class*='chatbot_Chip'], [class*='chipItem']");
+    for (var i = 0; i < chips.length && !picked; i++) {
+        if ((chips[i].innerText || '').trim().toLowerCase() === choice) { chips[i].click(); picked = true; filled++; }
+    }
+    var sels = root.querySelectorAll('select');
+    for (var i = 0; i < sels.length && !picked; i++) {
+        for (var j = 0; j < sels[i].options.length; j++) {
+            if ((sels[i].options[j].text || '').trim().toLowerCase() === choice) {
+                sels[i].selectedIndex = j;
+                sels[i].dispatchEvent(new Event('change', {bubbles: true}));
+                picked = true; filled++; break;
+            }
+        }
+    }
+}
+var sent = nkResolve(root, arguments[2], false, true);
+if (sent[0].length) { sent[0][0].click(); }
+return {filled: filled, sent: sent[1] >= 0, send_hit: sent[1]};
+"""
+
+# True once the drawer closed, a different bot question has rendered and settled, or nothing changed for 2s.
+CHATBOT_NEXT_TURN_JS = CHATBOT_QUESTION_JS + """
+if (!visible(root)) { return true; }
+if (!root.__nkObserver) {
+    root.__nkLast = Date.now();
+    root.__nkObserver = new MutationObserver(function () { root.__nkLast = Date.now(); });
+    root.__nkObserver.observe(root, {childList: true, subtree: true, characterData: true});
+}
+var quiet = Date.now() - root.__nkLast;
+return (lastQuestion() !== arguments[0] && quiet >= 300) || quiet >= 2000;
+"""
+
 def answer_chatbot_and_submit(job_id, title, company, salary_text, job_link):
     """
-    Answer chatbot questions inside chatbot_DrawerContentWrapper.
-    - support contenteditable divs (div.textArea[contenteditable="true"]) by setting innerText and dispatching input event
-    - fill text inputs, textareas, select the first radio/checkbox/label if possible
-    - click div.sendMsg (preferred) or Next/Submit button
+    Answer chatbot questions inside chatbot_DrawerContentWrapper, one turn per iteration:
+    - read the latest bot question and the turn's choice options in one call
+    - answer from the cache, else classify the question and answer from the profile (fallback TEXT_VALUE_FOR_BOT)
+    - fill every field of the turn and click the send control (sendMsg / Next / Submit) in one call
     - loop until drawer disappears or max iterations reached
     Returns True if drawer closed or looks handled, False otherwise.
     """
     logging.info(f"Chatbot appeared for {job_id}, attempting to auto-answer...")
+    chatbot_stats["chatbots"] += 1
     max_iterations = 20
+    handled = False
+    turns = 0
+    pending = None  # (question key, answer) waiting to see whether the bot accepted it
+    rejected = set()
+    question = None
     try:
+        wait_for("chatbot_idle", timeout=5)  # let UI settle
         for iteration in range(max_iterations):
-            time.sleep(0.6)  # let UI settle
-
-            # check presence
-            try:
-                chatbot_el = driver.find_element(By.CLASS_NAME, "chatbot_DrawerContentWrapper")
-            except Exception:
-                logging.info("Chatbot wrapper not found; assuming closed.")
-                return True
-
-            # if not visible, done
-            try:
-                if not chatbot_el.is_displayed():
-                    logging.info("Chatbot wrapper not visible; done.")
-                    return True
-            except Exception:
-                pass
-
-            answered_any = False
-
-            # 1) fill normal text inputs
-            try:
-                text_inputs = chatbot_el.find_elements(By.XPATH, ".//input[not(@type) or @type='text']")
-                for t in text_inputs:
-                    try:
-                        if t.is_displayed() and t.is_enabled():
-                            try:
-                                t.clear()
-                            except Exception:
-                                pass
-                            t.send_keys(TEXT_VALUE_FOR_BOT)
-                            answered_any = True
-                            time.sleep(0.25)
-                    except Exception:
-                        continue
-            except Exception:
-                pass
-
-            # 2) fill contenteditable divs (div.textArea[contenteditable='true'])
-            try:
-                editable_divs = chatbot_el.find_elements(By.XPATH, ".//div[contains(@class,'textArea') and (@contenteditable='true' or @contenteditable='')]")
-                for div in editable_divs:
-                    try:
-                        if div.is_displayed():
-                            # set innerText and dispatch input event so the site notices the change
-                            driver.execute_script("""
-                                arguments[0].focus();
-                                arguments[0].innerText = arguments[1];
-                                arguments[0].dispatchEvent(new Event('input', {bubbles: true}));
-                            """, div, TEXT_VALUE_FOR_BOT)
-                            # also try send_keys to be safe (some frameworks detect key events)
-                            try:
-                                div.click()
-                                div.send_keys(TEXT_VALUE_FOR_BOT)
-                            except Exception:
-                                pass
-                            answered_any = True
-                            time.sleep(0.4)
-                    except Exception:
-                        continue
-            except Exception:
-                pass
-
-            # 3) fill <textarea> if present
-            try:
-                textareas = chatbot_el.find_elements(By.XPATH, ".//textarea")
-                for ta in textareas:
-                    try:
-                        if ta.is_displayed() and ta.is_enabled():
-                            try:
-                                ta.clear()
-                            except Exception:
-                                pass
-                            ta.send_keys(TEXT_VALUE_FOR_BOT)
-                            answered_any = True
-                            time.sleep(0.3)
-                    except Exception:
-                        continue
-            except Exception:
-                pass
-
-            # 4) click radio/checkbox inputs
-            try:
-                inputs = chatbot_el.find_elements(By.XPATH, ".//input[@type='radio' or @type='checkbox']")
-                for inp in inputs:
-                    try:
-                        if inp.is_displayed() and inp.is_enabled():
-                            driver.execute_script("arguments[0].click();", inp)
-                            answered_any = True
-                            time.sleep(0.25)
-                            break
-                    except Exception:
-                        continue
-                # fallback: click the first visible label option
-                if not answered_any:
-                    label_opts = chatbot_el.find_elements(By.XPATH, ".//label")
-                    for lbl in label_opts:
-                        try:
-                            txt = (lbl.text or "").strip()
-                            if txt and lbl.is_displayed():
-                                driver.execute_script("arguments[0].click();", lbl)
-                                answered_any = True
-                                time.sleep(0.25)
-                                break
-                        except Exception:
-                            continue
-            except Exception:
-                pass
+            turn = driver.execute_script(CHATBOT_TURN_JS)
+            if not turn:
+                logging.info("Chatbot closed after answers.")
+                handled = True
+                break
 
-            # 5) select first option in selects
-            try:
-                selects = chatbot_el.find_elements(By.TAG_NAME, "select")
-                for sel in selects:
-                    try:
-                        if sel.is_displayed() and sel.is_enabled():
-                            try:
-                                Select(sel).select_by_index(1)
-                            except Exception:
-                                try:
-                                    Select(sel).select_by_index(0)
-                                except Exception:
-                                    pass
-                            answered_any = True
-                            time.sleep(0.3)
-                            break
-                    except Exception:
-                        continue
-            except Exception:
-                pass
+            question = turn["question"]
+            key = normalize_question(question)
+            if pending:
+                if key == pending[0]:
+                    # Same question asked again: the answer was not accepted
+                    chatbot_stats["rejected"] += 1
+                    answer_cache.pop(key, None)
+                    if key in rejected:
+                        logging.info(f"Chatbot keeps repeating '{question}'; giving up.")
+                        break
+                    rejected.add(key)
+                else:
+                    answer_cache[pending[0]] = pending[1]
+                pending = None
+
+            pace("chatbot_answer")
+            with span("chatbot_turn") as turn_span:
+                answer, source = resolve_answer(question, turn["options"], retry=key in rejected)
+                logging.info(f"Chatbot Q: {question!r} -> {answer!r} ({source})")
+                send_chain = selector_registry.chain("chatbot_send")
+                result = driver.execute_script(CHATBOT_FILL_JS, answer, answer if turn["options"] else "", send_chain)
+                if "send_hit" in result:
+                    selector_registry.record("chatbot_send", send_chain, result["send_hit"])
+                turn_span["outcome"] = source
+            if not result["filled"] and not result["sent"]:
+                logging.info("Could not auto-answer further questions (no recognizable inputs/buttons).")
+                break
+            turns += 1
+            if key:
+                pending = (key, answer)
 
-            # 6) click send button(s) - prefer div.sendMsg
-            try:
-                send_btns = chatbot_el.find_elements(By.CSS_SELECTOR, "div.sendMsg, button.sendMsg, .sendMsg")
-                for sbtn in send_btns:
-                    try:
-                        if sbtn.is_displayed():
-                            driver.execute_script("arguments[0].click();", sbtn)
-                            answered_any = True
-                            time.sleep(0.8)  # let the next question appear
-                            break
-                    except Exception:
-                        continue
-            except Exception:
-                pass
+            # wait for the bot's next question (or the drawer to close)
+            wait_for("chatbot_turn", question, timeout=8)
+        else:
+            logging.warning("Chatbot still present after attempts.")
 
-            # 7) fallback: click a Next/Submit/Continue inside the chatbot container
-            try:
-                nxt_btn = None
-                try:
-                    nxt_btn = chatbot_el.find_element(By.XPATH, ".//button[contains(.,'Next') or contains(.,'Submit') or contains(.,'Continue')]")
-                except Exception:
-                    try:
-                        nxt_btn = chatbot_el.find_element(By.XPATH, ".//a[contains(.,'Next') or contains(.,'Submit') or contains(.,'Continue')]")
-                    except Exception:
-                        nxt_btn = None
+        if handled and pending:
+            answer_cache[pending[0]] = pending[1]
+    except Exception as e:
+        logging.exception(f"Exception while answering chatbot for {job_id}: {e}")
+        handled = False
+
+    chatbot_stats["turns"] += turns
+    if handled:
+        chatbot_stats["handled"] += 1
+    logging.info(f"Chatbot for {job_id}: handled={handled}, turns={turns}")
+    save_answer_cache()
+    return handled
+
+def log_chatbot_summary():
+    s = chatbot_stats
+    if not s["chatbots"]:
+        return
+    logging.info(
+        f"Chatbots: {s['handled']}/{s['chatbots']} handled ({100 * s['handled'] / s['chatbots']:.0f}%), "
+        f"{s['turns'] / s['chatbots']:.1f} turns per chatbot, {s['cache_hits']} cached answers, "
+        f"{s['rejected']} rejected answers, questions by category: {s['categories']}"
+    )
+
+# ---------------- APPLY BUDGET ----------------
+# [applied, in_flight] in shared memory so MAX_APPLY holds across worker processes.
+# A slot is reserved before clicking Apply, then either committed or released.
+apply_budget = None
+# False in worker processes and HTTP harvesting, where the browser never holds the results page
+RESULTS_IN_BROWSER = True
+
+apply_slot_held = False  # this process has reserved a slot and not settled it yet
+
+def reserve_apply_slot():
+    global apply_slot_held
+    with apply_budget.get_lock():
+        if apply_budget[0] + apply_budget[1] >= MAX_APPLY:
+            return False
+        apply_budget[1] += 1
+        apply_slot_held = True
+        return True
 
-                if nxt_btn and nxt_btn.is_displayed() and nxt_btn.is_enabled():
-                    driver.execute_script("arguments[0].click();", nxt_btn)
-                    answered_any = True
-                    time.sleep(0.9)
-            except Exception:
-                pass
+def finish_apply_slot(applied):
+    global apply_slot_held
+    apply_slot_held = False
+    with apply_budget.get_lock():
+        apply_budget[1] -= 1
+        if applied:
+            apply_budget[0] += 1
+        return apply_budget[0]
+
+def applied_so_far():
+    return apply_budget[0]
+
+# ---------------- CHECKPOINT ----------------
+# The crawl position and the jobs being worked on are kept in the ledger as the run goes,
+# so a run that dies (Chrome crash, fatal error, CI timeout) resumes where it stopped.
+# A run that finishes normally clears its checkpoint; the next one starts from page 1.
+resumed_clicks = set()  # job ids whose Apply click the interrupted run never got to record
+
+def checkpoint_query():
+    return json.dumps([SKILLS, EXPERIENCE])
+
+def save_checkpoint(page_num, page_url, visited_pages):
+    """Record the page about to be processed (visited_pages excludes it). Called at the start of each page."""
+    try:
+        with ledger:
+            ledger.execute(
+                "INSERT OR REPLACE INTO checkpoint (query, page_num, page_url, visited_pages, applied_count, run_id) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (checkpoint_query(), page_num, page_url, json.dumps(sorted(visited_pages)), applied_so_far(), RUN_ID),
+            )
+    except Exception as e:
+        logging.warning(f"Could not save checkpoint: {e}")
+
+def load_checkpoint():
+    """The unfinished run's checkpoint for this query, or None if there is none or it is too old."""
+    row = ledger.execute(
+        "SELECT page_num, page_url, visited_pages, applied_count, run_id, "
+        "(julianday('now') - julianday(updated_at)) * 24 FROM checkpoint WHERE query = ?",
+        (checkpoint_query(),),
+    ).fetchone()
+    if not row:
+        return None
+    if row[5] > RESUME_MAX_AGE_HOURS:
+        logging.info(f"Ignoring checkpoint of run {row[4]}: {row[5]:.1f}h old")
+        return None
+    return {"page_num": row[0], "page_url": row[1], "visited_pages": set(json.loads(row[2])),
+            "applied_count": row[3], "run_id": row[4]}
 
-            # if nothing we could do in this iteration, break to avoid infinite loop
-            if not answered_any:
-                logging.info("Could not auto-answer further questions (no recognizable inputs/buttons).")
-                break
+def clear_checkpoint():
+    with ledger:
+        ledger.execute("DELETE FROM checkpoint WHERE query = ?", (checkpoint_query(),))
 
-            # check if drawer closed after actions
-            time.sleep(0.5)
-            try:
-                current_chat = driver.find_element(By.CLASS_NAME, "chatbot_DrawerContentWrapper")
-                if not current_chat.is_displayed():
-                    logging.info("Chatbot closed after answers.")
-                    return True
-            except Exception:
-                logging.info("Chatbot element not found after answering; assuming closed.")
-                return True
+def mark_in_flight(job, stage):
+    try:
+        with ledger:
+            ledger.execute(
+                "INSERT OR REPLACE INTO in_flight (job_id, job, stage, run_id) VALUES (?, ?, ?, ?)",
+                (job[0], json.dumps(job), stage, RUN_ID),
+            )
+    except Exception as e:
+        logging.warning(f"Could not mark {job[0]} in flight: {e}")
 
-        # after iterations, check if closed or present
-        try:
-            driver.find_element(By.CLASS_NAME, "chatbot_DrawerContentWrapper")
-            logging.warning("Chatbot still present after attempts.")
-            return False
-        except Exception:
-            return True
+def clear_in_flight(job_id):
+    """Drop the job from in_flight and bring the checkpoint's applied count up to date, in one transaction."""
+    try:
+        with ledger:
+            ledger.execute("DELETE FROM in_flight WHERE job_id = ?", (job_id,))
+            ledger.execute("UPDATE checkpoint SET applied_count = ?, updated_at = datetime('now') WHERE query = ?",
+                           (applied_so_far(), checkpoint_query()))
+    except Exception as e:
+        logging.warning(f"Could not clear in-flight job {job_id}: {e}")
 
+def recover_in_flight(reopen=True):
+    """
+    Finish the jobs earlier runs left half-done. Jobs already recorded are just cleared; the rest are
+    opened again by URL (or only cleared when reopen is False). A job whose Apply click went through
+    shows as Applied there and is recorded as applied (see resumed_clicks) rather than as "Already Applied".
+    Rows of this run (other fan-out queries still at work) are left alone.
+    """
+    rows = ledger.execute(
+        "SELECT job_id, job, stage FROM in_flight WHERE run_id IS NULL OR run_id != ?", (RUN_ID,)
+    ).fetchall()
+    for job_id, job, stage in rows:
+        if job_id in existing_job_ids or not reopen:
+            clear_in_flight(job_id)
+            continue
+        if SHARED_DEDUPE and not claim_job(job_id):
+            continue  # another query process of this run is recovering it
+        logging.info(f"Recovering in-flight job {job_id} (stage: {stage})")
+        if stage == "apply_clicked":
+            resumed_clicks.add(job_id)
+        process_job(tuple(json.loads(job)))
+        clear_in_flight(job_id)
+    return len(rows)
+
+# ---------------- INCREMENTAL CRAWL ----------------
+# With INCREMENTAL, results are listed newest first and each query keeps a high-water mark in the ledger:
+# when its last complete crawl started and the first job ids it saw. Cards already in the ledger, among
+# those ids, or posted before the mark are stale; INCREMENTAL_STOP_STREAK stale cards in a row mean the
+# rest of the results were seen before, and the crawl stops there. The mark only moves after a crawl that
+# got that far or ran out of results, never after one cut short by MAX_APPLY or HARVEST_MAX_PAGES.
+WATERMARK_IDS = 20  # newest job ids kept per query
+
+watermark = None  # {"last_run_at": epoch seconds, "ids": set} of the current query, or None
+watermark_age_days = 0.0
+crawl_started_at = 0.0
+stale_streak = 0
+newest_seen = []  # first job ids of this crawl, in result order
+crawl_complete = False  # this crawl caught up with the mark or reached the end of the results
+
+def freshness_url(url):
+    """url with INCREMENTAL_SORT's parameters set, so results are listed newest first."""
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query, keep_blank_values=True))
+    params.update(parse_qsl(INCREMENTAL_SORT))
+    return urlunsplit(parts._replace(query=urlencode(params)))
+
+def load_watermark():
+    """Start tracking a crawl of the current query and read its high-water mark."""
+    global watermark, watermark_age_days, crawl_started_at, stale_streak, crawl_complete
+    crawl_started_at = time.time()
+    stale_streak = 0
+    crawl_complete = False
+    newest_seen.clear()
+    row = ledger.execute(
+        "SELECT last_run_at, newest_ids FROM watermarks WHERE query = ?", (checkpoint_query(),)
+    ).fetchone()
+    if not row:
+        watermark = None
+        return None
+    watermark = {"last_run_at": row[0], "ids": set(json.loads(row[1]))}
+    watermark_age_days = (crawl_started_at - row[0]) / 86400
+    logging.info(f"Incremental: last complete crawl {watermark_age_days:.1f} days ago, {len(watermark['ids'])} newest ids")
+    return watermark
+
+def save_watermark():
+    """Move the mark up to this crawl. Only for a complete crawl that saw every new card (not stopped by MAX_APPLY)."""
+    ids = newest_seen or sorted(watermark["ids"] if watermark else [])
+    try:
+        with ledger:
+            ledger.execute(
+                "INSERT OR REPLACE INTO watermarks (query, last_run_at, newest_ids) VALUES (?, ?, ?)",
+                (checkpoint_query(), crawl_started_at, json.dumps(ids)),
+            )
     except Exception as e:
-        logging.exception(f"Exception while answering chatbot for {job_id}: {e}")
+        logging.warning(f"Could not save incremental watermark: {e}")
+
+def card_is_stale(card):
+    """Seen before (ledger, Applied tag, the last crawl's newest ids) or posted before the last crawl started."""
+    job_id = str(card["job_id"] or "")
+    if card.get("applied") or job_id in existing_job_ids:
+        return True
+    if watermark is None:
         return False
+    if job_id in watermark["ids"]:
+        return True
+    days = card_fields(card)["posted_days"]
+    return days is not None and days > watermark_age_days + 1  # posting ages are whole days
 
-# ---------------- MAIN FLOW ----------------
-try:
-    # ---------- LOGIN ----------
+def incremental_cut(cards):
+    """
+    Returns (cards, caught_up): in incremental mode the page's cards up to the one that completes a streak
+    of INCREMENTAL_STOP_STREAK stale cards, and whether it was completed. Cards must be in result order.
+    """
+    global stale_streak
+    if not INCREMENTAL:
+        return cards, False
+    for i, card in enumerate(cards):
+        if len(newest_seen) < WATERMARK_IDS and card["job_id"]:
+            newest_seen.append(str(card["job_id"]))
+        stale_streak = stale_streak + 1 if card_is_stale(card) else 0
+        if stale_streak >= INCREMENTAL_STOP_STREAK:
+            return cards[:i + 1], True
+    return cards, False
+
+def mark_crawl_complete():
+    global crawl_complete
+    crawl_complete = True
+
+def log_caught_up(page_num):
+    mark_crawl_complete()
+    logging.info(f"Incremental: {stale_streak} known or older cards in a row on page {page_num}; stopping.")
+    print(f"Caught up with the last run on page {page_num}; ending.")
+
+# ---------------- LOGIN & SEARCH ----------------
+def login():
     logging.info("Opening login page")
     print("Opening login page...")
     driver.get(LOGIN_URL)
-    try:
-        wait.until(EC.presence_of_element_located((By.ID, "usernameField")))
-    except TimeoutException:
-        driver.save_screenshot("login_page_not_loaded.png")
+    username_input = wait_for_element("login_username", timeout=30)
+    if username_input is None:
+        capture_failure("login_page", error="usernameField not found")
         logging.error("Login page did not load usernameField; exiting.")
         raise SystemExit("Login field not found")
 
     try:
-        username_input = driver.find_element(By.ID, "usernameField")
-        password_input = driver.find_element(By.ID, "passwordField")
+        password_input = locate("login_password")
         username_input.clear()
         username_input.send_keys(NAUKRI_EMAIL)
         password_input.clear()
         password_input.send_keys(NAUKRI_PASSWORD)
-        submit_btn = driver.find_element(By.XPATH, "//button[@type='submit']")
+        submit_btn = locate("login_submit")
         print("Submitting login...")
         if not safe_click(submit_btn):
             try:
@@ -388,406 +1837,2035 @@ try:
             except Exception:
                 pass
         logging.info("Login submitted")
-        time.sleep(4)
+        if wait_for("login_done", timeout=15):
+            save_session()
+        else:
+            logging.warning("Still on the login page after submitting; continuing anyway.")
     except Exception as e:
-        driver.save_screenshot("login_error.png")
         logging.error(f"Login error: {e}", exc_info=True)
+        capture_failure("login", error=e)
         raise
 
-    # ---------- SEARCH ----------
+def restore_cookies(cookies):
+    """Load the coordinator's logged-in cookies into this process's browser."""
+    driver.get(BASE_URL)
+    for cookie in cookies:
+        try:
+            driver.add_cookie(cookie)
+        except Exception as e:
+            logging.debug(f"Skipped cookie {cookie.get('name')}: {e}")
+
+def save_session():
+    """Persist cookies and localStorage after a successful login (written atomically)."""
+    if not SESSION_FILE:
+        return
+    try:
+        session = {
+            "saved_at": time.time(),
+            "cookies": driver.get_cookies(),
+            "local_storage": driver.execute_script(
+                "var o = {}; for (var i = 0; i < localStorage.length; i++) "
+                "{ var k = localStorage.key(i); o[k] = localStorage.getItem(k); } return o;"
+            ),
+        }
+        atomic_json_merge(SESSION_FILE, session)
+        logging.info(f"Saved login session to {SESSION_FILE}")
+    except Exception as e:
+        logging.warning(f"Could not save login session: {e}")
+
+def restore_session():
+    """Reuse the session saved by a previous run. Returns True if it is still logged in."""
+    if not SESSION_FILE or not os.path.exists(SESSION_FILE):
+        return False
+    try:
+        with open(SESSION_FILE) as f:
+            session = json.load(f)
+        restore_cookies(session.get("cookies", []))
+        driver.execute_script(
+            "for (var k in arguments[0]) { localStorage.setItem(k, arguments[0][k]); }",
+            session.get("local_storage", {}),
+        )
+        driver.get(SESSION_CHECK_URL)
+    except Exception as e:
+        logging.warning(f"Could not restore saved session: {e}")
+        return False
+    if wait_for("logged_in", timeout=10):
+        logging.info(f"Reused saved login session from {SESSION_FILE}")
+        print("Reused saved login session.")
+        return True
+    logging.info("Saved login session has expired; logging in again.")
+    try:
+        driver.delete_all_cookies()
+    except Exception:
+        pass
+    return False
+
+def run_search():
     logging.info("Navigating to job search page")
     print("Navigating to job search page...")
     driver.get(SEARCH_URL)
-    time.sleep(2)
     try:
-        search_bar_container = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "nI-gNb-sb__main")))
+        search_bar_container = wait_for_element("search_bar", timeout=30, required=True)
         safe_click(search_bar_container)
-        search_box = wait.until(EC.presence_of_element_located((By.XPATH, "//input[@placeholder='Enter keyword / designation / companies']")))
+        search_box = wait_for_element("search_input", timeout=30, usable=False, required=True)
         search_box.clear()
         search_box.send_keys(SKILLS)
-        exp_dropdown = wait.until(EC.element_to_be_clickable((By.XPATH, "//div[@class='dropdownMainContainer']")))
+        exp_dropdown = wait_for_element("experience_dropdown", timeout=30, required=True)
         safe_click(exp_dropdown)
-        exp_option = wait.until(EC.element_to_be_clickable((By.XPATH, f"//li[@title='{EXPERIENCE} years']")))
+        exp_option = wait_for_element("experience_option", timeout=30, required=True, experience=EXPERIENCE)
         safe_click(exp_option)
-        search_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[@class='nI-gNb-sb__icon-wrapper']")))
+        search_button = wait_for_element("search_button", timeout=30, required=True)
+        search_page_url = driver.current_url
         safe_click(search_button)
         logging.info("Search executed")
         print("Search executed, waiting for results...")
-        time.sleep(4)
+        wait_for("url_changed", search_page_url, timeout=10)
+        wait_for("results_rendered", timeout=15)
+        if INCREMENTAL and freshness_url(driver.current_url) != driver.current_url:
+            driver.get(freshness_url(driver.current_url))
+            wait_for("results_rendered", timeout=15)
     except Exception as e:
-        driver.save_screenshot("search_error.png")
         logging.error(f"Job search failed: {e}", exc_info=True)
+        capture_failure("search", error=e)
         raise
 
-    # ---------- MAIN LOOP (pages -> jobs) ----------
-    applied_count = 0
-    page_num = 1
-    visited_pages = set()
-    print(f"Starting job processing (target apply count = {MAX_APPLY})")
-
-    while applied_count < MAX_APPLY:
-        logging.info(f"Processing page {page_num}")
-        print(f"\n--- Processing page {page_num} --- (applied so far: {applied_count})")
-        current_url = driver.current_url
-        if current_url in visited_pages:
-            logging.info("Already visited this page URL; stopping to avoid loop.")
-            break
-        visited_pages.add(current_url)
+# ---------------- CARD FILTERS ----------------
+# Rules from FILTERS_FILE (JSON) are checked against every new card on a page before any job is opened.
+# Card text is parsed into typed values by memoized parsers (the same strings repeat across pages),
+# and each rejection is recorded with a reason code.
+DEFAULT_FILTERS = {
+    "min_salary_lpa": MIN_EXPECTED_SALARY,  # reject when the top of the card's range is below this
+    "experience_years": None,  # reject when outside the card's "min-max Yrs"
+    "locations": [],  # allowed cities (substring match); remote jobs always pass; empty = anywhere
+    "exclude_locations": [],
+    "work_modes": [],  # any of "office", "hybrid", "remote"; empty = any
+    "exclude_companies": [],  # case-insensitive substring match
+    "exclude_title_words": [],  # case-insensitive whole words
+    "max_posted_days": None,
+}
+
+# Ledger status recorded for each reason code
+FILTER_STATUS = {
+    "salary_below_min": "Skipped (Low Salary)",
+    "experience_mismatch": "Skipped (Experience Mismatch)",
+    "location_excluded": "Skipped (Location)",
+    "work_mode_excluded": "Skipped (Work Mode)",
+    "company_excluded": "Skipped (Company Blocklist)",
+    "title_excluded": "Skipped (Title)",
+    "posted_too_old": "Skipped (Old Posting)",
+    "repost": "Skipped (Repost)",
+}
+
+SALARY_AMOUNT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(crores?|cr|lakhs?|lacs?|lpa|l|k)?\b")
+SALARY_UNIT_LPA = {"crore": 100, "crores": 100, "cr": 100, "lakh": 1, "lakhs": 1, "lac": 1, "lacs": 1,
+                   "lpa": 1, "l": 1, "k": 0.01}
+MONTHLY_RE = re.compile(r"per month|monthly|/\s*month|\bp\.?\s?m\b")
+EXPERIENCE_RANGE_RE = re.compile(r"(\d+)\s*(?:-|to)\s*(\d+)|(\d+)\s*\+?")
+POSTED_RE = re.compile(r"(\d+)\+?\s*(minute|hour|day|week|month)")
+POSTED_UNIT_DAYS = {"minute": 0, "hour": 0, "day": 1, "week": 7, "month": 30}
+WORK_MODE_RE = re.compile(r"\b(hybrid|remote|work from home|wfh)\b")
+NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+COMPANY_SUFFIX_RE = re.compile(r"\b(pvt|private|ltd|limited|inc|llp|llc|corp|corporation|co)\b")
+
+card_rules = None  # compiled from FILTERS_FILE on first use
+filter_stats = {}  # reason code -> jobs skipped
+
+@lru_cache(maxsize=1024)
+def parse_salary_range(text):
+    """
+    (min, max) in LPA from card salary text: "30-45 Lacs PA", "1-1.5 Cr PA", "80 Lacs - 1.2 Cr",
+    "6,00,000 - 9,00,000 P.A." or "50k-70k per month". None when undisclosed or unreadable.
+    """
+    if not text:
+        return None
+    s = text.lower().replace(",", "")
+    if "not disclose" in s:
+        return None
+    amounts = SALARY_AMOUNT_RE.findall(s)[:2]
+    if not amounts:
+        return None
+    # A bare number takes the unit of the one after it ("30-45 Lacs"); no unit at all means rupees or lakhs
+    units = [unit for _, unit in amounts]
+    if not units[0] and len(units) > 1:
+        units[0] = units[1]
+    values = []
+    for (number, _), unit in zip(amounts, units):
+        value = float(number)
+        if unit:
+            value *= SALARY_UNIT_LPA[unit]
+        elif value >= 1000:
+            value /= 100000
+        values.append(value)
+    if MONTHLY_RE.search(s):
+        values = [v * 12 for v in values]
+    return (min(values), max(values))
+
+@lru_cache(maxsize=256)
+def parse_experience_range(text):
+    """(min, max) years from "8-13 Yrs", "5+ Yrs" (max None) or "Fresher" (0, 0). None when absent."""
+    if not text:
+        return None
+    s = text.lower()
+    if "fresher" in s:
+        return (0, 0)
+    m = EXPERIENCE_RANGE_RE.search(s)
+    if not m:
+        return None
+    if m.group(1):
+        return (int(m.group(1)), int(m.group(2)))
+    return (int(m.group(3)), None if "+" in m.group(0) else int(m.group(3)))
+
+@lru_cache(maxsize=1024)
+def parse_location(text):
+    """(work_mode, cities) from "Bengaluru, Pune", "Hybrid - Hyderabad" or "Remote"; work_mode is office/hybrid/remote."""
+    if not text:
+        return (None, ())
+    s = text.lower()
+    modes = set(WORK_MODE_RE.findall(s))
+    mode = "remote" if modes - {"hybrid"} else "hybrid" if modes else "office"
+    s = WORK_MODE_RE.sub(" ", s)
+    cities = tuple(c.strip(" -") for c in re.split(r"[,/()]", s) if c.strip(" -"))
+    return (mode, cities)
+
+@lru_cache(maxsize=128)
+def parse_posted_days(text):
+    """Days since posting from "3 Days Ago", "30+ Days Ago", "Just Now" or "Today". None when absent."""
+    if not text:
+        return None
+    s = text.lower()
+    if "just now" in s or "today" in s or "few hours" in s:
+        return 0
+    m = POSTED_RE.search(s)
+    if not m:
+        return None
+    return int(m.group(1)) * POSTED_UNIT_DAYS[m.group(2)]
+
+def card_fields(card):
+    """Typed values for one card record, parsed once and kept on the card as card["fields"]."""
+    if "fields" not in card:
+        mode, cities = parse_location(card.get("location"))
+        card["fields"] = {
+            "salary": parse_salary_range(card.get("salary")),
+            "experience": parse_experience_range(card.get("experience")),
+            "work_mode": mode,
+            "cities": cities,
+            "posted_days": parse_posted_days(card.get("posted")),
+            "company": (card.get("company") or "").lower(),
+            "title": (card.get("title") or "").lower(),
+        }
+    return card["fields"]
+
+def words_pattern(words, whole_words=False):
+    """One compiled case-insensitive alternation for a word list, or None when the list is empty."""
+    words = [w.strip().lower() for w in words or [] if w and w.strip()]
+    if not words:
+        return None
+    alternation = "|".join(re.escape(w) for w in words)
+    return re.compile(rf"\b(?:{alternation})\b" if whole_words else alternation)
 
-        # Prefer job container inside chatbot wrapper if present
-        jobs = []
+def compile_card_filters(config):
+    """
+    Turn a filter config into an ordered list of (reason_code, check) pairs.
+    check(fields) returns a short detail string when the card is rejected, else None.
+    """
+    rules = []
+
+    min_salary = config.get("min_salary_lpa")
+    if min_salary:
+        def salary_check(f):
+            if f["salary"] and f["salary"][1] < min_salary:
+                return f"max {f['salary'][1]:g} LPA < {min_salary:g}"
+        rules.append(("salary_below_min", salary_check))
+
+    years = config.get("experience_years")
+    if years not in (None, ""):
+        years = float(years)
+        def experience_check(f):
+            exp = f["experience"]
+            if exp and (years < exp[0] or (exp[1] is not None and years > exp[1])):
+                return f"{years:g} yrs outside {exp[0]}-{'' if exp[1] is None else exp[1]}"
+        rules.append(("experience_mismatch", experience_check))
+
+    allowed = words_pattern(config.get("locations"))
+    excluded = words_pattern(config.get("exclude_locations"))
+    if allowed or excluded:
+        def location_check(f):
+            if excluded and any(excluded.search(c) for c in f["cities"]):
+                return ", ".join(f["cities"])
+            if allowed and f["cities"] and f["work_mode"] != "remote" and not any(allowed.search(c) for c in f["cities"]):
+                return ", ".join(f["cities"])
+        rules.append(("location_excluded", location_check))
+
+    modes = {m.lower() for m in config.get("work_modes") or []}
+    if modes:
+        def work_mode_check(f):
+            if f["work_mode"] and f["work_mode"] not in modes:
+                return f["work_mode"]
+        rules.append(("work_mode_excluded", work_mode_check))
+
+    companies = words_pattern(config.get("exclude_companies"))
+    if companies:
+        def company_check(f):
+            if companies.search(f["company"]):
+                return f["company"]
+        rules.append(("company_excluded", company_check))
+
+    title_words = words_pattern(config.get("exclude_title_words"), whole_words=True)
+    if title_words:
+        def title_check(f):
+            m = title_words.search(f["title"])
+            if m:
+                return m.group(0)
+        rules.append(("title_excluded", title_check))
+
+    max_days = config.get("max_posted_days")
+    if max_days:
+        def posted_check(f):
+            if f["posted_days"] is not None and f["posted_days"] > max_days:
+                return f"{f['posted_days']} days old"
+        rules.append(("posted_too_old", posted_check))
+
+    return rules
+
+def load_card_filters():
+    config = dict(DEFAULT_FILTERS)
+    if FILTERS_FILE and os.path.exists(FILTERS_FILE):
         try:
-            container = driver.find_element(By.CLASS_NAME, "chatbot_DrawerContentWrapper")
-            jobs = container.find_elements(By.XPATH, ".//div[contains(@class,'srp-jobtuple-wrapper') or contains(@class,'jobTuple')]")
-            logging.info("Found job container inside chatbot_DrawerContentWrapper")
-        except Exception:
-            # fallback to site-wide job cards
-            jobs = driver.find_elements(By.XPATH, "//div[contains(@class,'srp-jobtuple-wrapper') or contains(@class,'jobTuple')]")
-
-        if not jobs:
-            logging.info("No job cards found on this page. Ending.")
-            print("No job cards found on this page. Ending.")
-            break
-
-        # iterate by index to avoid stale-element issues
-        idx = 0
-        while idx < len(jobs) and applied_count < MAX_APPLY:
-            # Re-fetch job list each iteration
-            try:
-                jobs = driver.find_elements(By.XPATH, "//div[contains(@class,'srp-jobtuple-wrapper') or contains(@class,'jobTuple')]")
-                job = jobs[idx]
-            except Exception:
-                idx += 1
-                continue
-            idx += 1
+            with open(FILTERS_FILE) as f:
+                config.update(json.load(f))
+        except Exception as e:
+            logging.warning(f"Could not read card filters {FILTERS_FILE}: {e}")
+    rules = compile_card_filters(config)
+    logging.info(f"Card filters: {[code for code, _ in rules]}")
+    return rules
+
+def filter_page(cards):
+    """
+    Check every new card of a page against the rules, then for reposts, in one pass before anything
+    is opened. Rejected cards get card["reject"] = (reason_code, detail); returns how many were rejected.
+    """
+    global card_rules
+    if card_rules is None:
+        card_rules = load_card_filters()
+    rejected = 0
+    page_seen = {}  # fingerprint -> job id, for reposts within the page
+    for card in cards:
+        if not card["job_id"] or str(card["job_id"]) in existing_job_ids or card["applied"]:
+            continue
+        fields = card_fields(card)
+        for code, check in card_rules:
+            detail = check(fields)
+            if detail:
+                card["reject"] = (code, detail)
+                break
+        if "reject" not in card and REPOST_WINDOW_DAYS > 0:
+            original = find_repost(card, page_seen)
+            if original:
+                card["reject"] = ("repost", f"same fingerprint as {original}")
+        rejected += "reject" in card
+    return rejected
+
+def job_fingerprint(card):
+    """
+    64-bit hash of the normalized company, title, salary range, cities and description snippet,
+    the same for a role reposted under a new job id.
+    """
+    f = card_fields(card)
+    company = " ".join(COMPANY_SUFFIX_RE.sub(" ", NON_WORD_RE.sub(" ", f["company"])).split())
+    title = " ".join(NON_WORD_RE.sub(" ", f["title"]).split())
+    salary = "%g-%g" % f["salary"] if f["salary"] else ""
+    snippet = " ".join(NON_WORD_RE.sub(" ", (card.get("snippet") or "").lower()).split())
+    key = "|".join([company, title, salary, ",".join(sorted(f["cities"])), snippet])
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big", signed=True)
+
+def find_repost(card, page_seen):
+    """
+    Job id this card reposts: a card earlier on the page, or a job opened within REPOST_WINDOW_DAYS
+    with the same fingerprint. Sets card["fingerprint"] for record_fingerprint().
+    """
+    fp = card["fingerprint"] = job_fingerprint(card)
+    if fp in page_seen:
+        return page_seen[fp]
+    page_seen[fp] = str(card["job_id"])
+    row = ledger.execute("SELECT job_id, seen_at FROM fingerprints WHERE fp = ?", (fp,)).fetchone()
+    if row and row[0] != str(card["job_id"]) and time.time() - row[1] < REPOST_WINDOW_DAYS * 86400:
+        return row[0]
+    return None
+
+def record_fingerprint(card):
+    """Remember the fingerprint of a job about to be opened (a later sighting restarts its window)."""
+    if card.get("fingerprint") is None:
+        return
+    try:
+        with ledger:
+            ledger.execute("INSERT OR REPLACE INTO fingerprints (fp, job_id, seen_at) VALUES (?, ?, ?)",
+                           (card["fingerprint"], str(card["job_id"]), int(time.time())))
+    except sqlite3.Error as e:
+        logging.warning(f"Could not record fingerprint of {card['job_id']}: {e}")
+
+def log_filter_summary():
+    if filter_stats:
+        logging.info(f"Card filter rejections by reason: {filter_stats}")
+
+# ---------------- RELEVANCE SCORING ----------------
+# TF-IDF cosine similarity between JD_FILE and each card's text. Document frequencies accumulate
+# over every card ever scored (once per job id) and are cached in RELEVANCE_CACHE_FILE, so IDF improves across runs.
+TOKEN_RE = re.compile(r"[a-z][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "the", "to", "we", "with", "you", "your", "our", "will", "have", "has", "need", "years", "yrs", "year",
+}
+
+relevance_model = None  # {"docs": int, "df": {term: count}, "jd": {term: count}, "saved": counts as last saved}
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+def relevance_enabled():
+    return RELEVANCE_MIN_SCORE > 0 or RELEVANCE_TOP_K > 0
+
+def load_relevance_model():
+    global relevance_model
+    model = {"docs": 0, "df": {}}
+    if RELEVANCE_CACHE_FILE and os.path.exists(RELEVANCE_CACHE_FILE):
+        try:
+            with open(RELEVANCE_CACHE_FILE) as f:
+                model.update(json.load(f))
+        except Exception as e:
+            logging.warning(f"Could not read relevance cache {RELEVANCE_CACHE_FILE}: {e}")
+    with open(JD_FILE, encoding="utf-8") as f:
+        jd_tokens = tokenize(f.read())
+    model["jd"] = {t: jd_tokens.count(t) for t in set(jd_tokens)}
+    model["saved"] = {"docs": model["docs"], "df": dict(model["df"])}  # counts already in the file
+    relevance_model = model
+    return model
+
+def add_new_relevance_counts(on_disk, model):
+    merged = {"docs": 0, "df": {}, **on_disk}
+    saved = model["saved"]
+    merged["docs"] += model["docs"] - saved["docs"]
+    for term, count in model["df"].items():
+        merged["df"][term] = merged["df"].get(term, 0) + count - saved["df"].get(term, 0)
+    return merged
+
+def save_relevance_model():
+    """Add this process's new counts to the file on disk (fan-out queries save concurrently), atomically."""
+    if relevance_model is None or not RELEVANCE_CACHE_FILE:
+        return
+    try:
+        atomic_json_merge(RELEVANCE_CACHE_FILE, relevance_model, add_new_relevance_counts)
+        relevance_model["saved"] = {"docs": relevance_model["docs"], "df": dict(relevance_model["df"])}
+    except Exception as e:
+        logging.warning(f"Could not save relevance cache: {e}")
 
-            # get job id
-            try:
-                job_id = job.get_attribute("data-job-id")
-            except StaleElementReferenceException:
-                continue
+def card_text(card):
+    return " ".join(filter(None, [card.get("title"), card.get("company"), " ".join(card.get("tags") or []), card.get("snippet")]))
 
-            if not job_id:
-                continue
-            if str(job_id) in existing_job_ids:
-                # skip already processed
+def uncounted_cards(job_ids):
+    """
+    The ids among job_ids whose cards are not in the document frequencies yet, marked counted in the
+    ledger in the same step so a card seen again (by another fan-out query or a later run) adds nothing.
+    """
+    new = set()
+    try:
+        with ledger:
+            for job_id in job_ids:
+                cur = ledger.execute("INSERT OR IGNORE INTO relevance_docs (job_id) VALUES (?)", (job_id,))
+                if cur.rowcount == 1:
+                    new.add(job_id)
+    except sqlite3.Error as e:
+        logging.warning(f"Could not record relevance documents: {e}")
+        return set()
+    return new
+
+def score_texts(texts, counted=None):
+    """
+    Cosine similarity of each text to the JD, for the whole batch in one matrix product.
+    counted[i] says whether text i is new to the document frequencies (default: all are).
+    """
+    model = relevance_model or load_relevance_model()
+    docs = [tokenize(t) for t in texts]
+    new_docs = [tokens for i, tokens in enumerate(docs) if counted is None or counted[i]]
+    df = model["df"]
+    for tokens in new_docs:
+        for term in set(tokens):
+            df[term] = df.get(term, 0) + 1
+    model["docs"] += len(new_docs)
+
+    vocab = {term: i for i, term in enumerate(set(model["jd"]).union(*docs))}
+    counts = np.zeros((len(docs), len(vocab)))
+    for row, tokens in enumerate(docs):
+        for term in tokens:
+            counts[row, vocab[term]] += 1
+    jd_counts = np.zeros(len(vocab))
+    for term, n in model["jd"].items():
+        jd_counts[vocab[term]] = n
+
+    idf = np.zeros(len(vocab))
+    for term, i in vocab.items():
+        idf[i] = np.log((1 + model["docs"]) / (1 + df.get(term, 0))) + 1
+    # sublinear tf, then tf-idf, then cosine against the JD vector
+    weights = np.where(counts > 0, 1 + np.log(np.maximum(counts, 1)), 0) * idf
+    jd_weights = np.where(jd_counts > 0, 1 + np.log(np.maximum(jd_counts, 1)), 0) * idf
+    norms = np.linalg.norm(weights, axis=1) * np.linalg.norm(jd_weights)
+    return np.divide(weights @ jd_weights, norms, out=np.zeros(len(docs)), where=norms > 0)
+
+def rank_page(cards):
+    """
+    Score a page's new cards against the JD in one batch, set card["score"]/card["relevant"]
+    (threshold and/or top-K per page), and return the cards best-first.
+    """
+    if not relevance_enabled():
+        return cards
+    fresh = [c for c in cards if c["job_id"] and str(c["job_id"]) not in existing_job_ids and not c.get("reject")]
+    if not fresh:
+        return cards
+    try:
+        new = uncounted_cards([str(c["job_id"]) for c in fresh])
+        scores = score_texts([card_text(c) for c in fresh], [str(c["job_id"]) in new for c in fresh])
+    except Exception as e:
+        logging.warning(f"Relevance scoring failed; opening every card: {e}")
+        return cards
+    order = np.argsort(-scores, kind="stable")
+    ranked = []
+    for rank, i in enumerate(order):
+        card = fresh[i]
+        card["score"] = float(scores[i])
+        card["relevant"] = card["score"] >= RELEVANCE_MIN_SCORE and (not RELEVANCE_TOP_K or rank < RELEVANCE_TOP_K)
+        ranked.append(card)
+    logging.info("Relevance ranking: " + ", ".join(
+        f"{c['job_id']}={c['score']:.3f}{'' if c['relevant'] else ' (skip)'}" for c in ranked
+    ))
+    fresh_ids = {id(c) for c in fresh}
+    return ranked + [c for c in cards if id(c) not in fresh_ids]
+
+# ---------------- APPLY CONFIRMATION ----------------
+# Chrome's performance log (enabled in build_chrome_options) carries the tab's network events. Around the
+# Apply click the log is read for the POST whose URL matches APPLY_API_PATTERN, and the job's status comes
+# from that response: its HTTP status and, for a JSON body, its "status"/"applyStatus" field. Waiting
+# after the click ends as soon as the response (or the chatbot) arrives. When a chatbot opens anyway, that
+# first response only started the questionnaire, and a fresh watch confirms the final submit.
+APPLY_CONFIRM = os.getenv("APPLY_CONFIRM", "True").lower() == "true"  # False = judge the outcome from the page
+APPLY_API_RE = re.compile(os.getenv("APPLY_API_PATTERN", r"/api/apply/|/apply-workflow/"))
+APPLY_RESPONSE_TIMEOUT = float(os.getenv("APPLY_RESPONSE_TIMEOUT", "10"))  # seconds to wait for the apply response
+APPLY_OK_VALUES = {"success", "ok", "applied", "true"}
+# Counted toward MAX_APPLY; "unconfirmed" is an apply whose response was never seen
+APPLIED_STATUSES = ("Applied Successfully", "Applied (unconfirmed)")
+
+class ApplyWatch:
+    """Network events of one apply attempt, read incrementally from the performance log."""
+
+    def __init__(self):
+        self.requests = set()  # ids of POSTs to the apply API
+        self.responses = {}  # request id -> HTTP status
+        self.outcome = None  # (ok, detail) once the response has fully arrived
+
+    def poll(self):
+        """Read the log entries since the last call. True once the outcome is known."""
+        if self.outcome:
+            return True
+        try:
+            entries = driver.get_log("performance")
+        except WebDriverException:
+            return False
+        for entry in entries:
+            message = entry["message"]
+            # cheap filter before parsing: a page load logs hundreds of events
+            if not any(name in message for name in ("requestWillBeSent", "responseReceived", "loadingFinished", "loadingFailed")):
                 continue
+            event = json.loads(message)["message"]
+            params = event.get("params", {})
+            rid = params.get("requestId")
+            method = event.get("method")
+            if method == "Network.requestWillBeSent":
+                request = params.get("request", {})
+                if request.get("method") == "POST" and APPLY_API_RE.search(request.get("url", "")):
+                    self.requests.add(rid)
+            elif method == "Network.responseReceived" and rid in self.requests:
+                self.responses[rid] = params.get("response", {}).get("status", 0)
+            elif method == "Network.loadingFinished" and rid in self.responses:
+                self.outcome = apply_outcome(self.responses[rid], response_body(rid))
+                return True
+            elif method == "Network.loadingFailed" and rid in self.requests:
+                self.outcome = (False, params.get("errorText") or "request failed")
+                return True
+        return False
 
-            # extract fields
-            try:
-                title_elem = job.find_element(By.XPATH, ".//a[contains(@class,'title')]")
-                title = title_elem.text.strip()
-                job_link = title_elem.get_attribute("href")
-            except Exception:
-                title = "Unknown Title"
-                job_link = "N/A"
-
-            try:
-                company = job.find_element(By.XPATH, ".//a[contains(@class,'comp-name') or contains(@class,'subTitle')]").text.strip()
-            except Exception:
-                company = "Unknown Company"
+def response_body(request_id):
+    try:
+        result = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+    except WebDriverException as e:
+        logging.debug(f"Apply response body unavailable: {e}")
+        return ""
+    if result.get("base64Encoded"):
+        return base64.b64decode(result["body"]).decode("utf-8", "replace")
+    return result.get("body", "")
+
+def apply_outcome(http_status, body):
+    """(ok, detail) for an apply API response: the HTTP status, then a JSON status field when there is one."""
+    if not 200 <= http_status < 300:
+        return False, f"HTTP {http_status}"
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return True, f"HTTP {http_status}"
+    if isinstance(data, dict):
+        for key in ("status", "applyStatus"):
+            value = data.get(key)
+            if isinstance(value, bool):
+                return value, data.get("message") or key
+            if isinstance(value, int):
+                return 200 <= value < 300, data.get("message") or f"{key} {value}"
+            if isinstance(value, str):
+                return value.lower() in APPLY_OK_VALUES, data.get("message") or value
+    return True, f"HTTP {http_status}"
+
+def start_apply_watch():
+    """Discard the network events logged so far; returns a watch, or None when confirmation is off or unavailable."""
+    if not APPLY_CONFIRM:
+        return None
+    try:
+        driver.get_log("performance")
+    except Exception as e:
+        logging.debug(f"Performance log unavailable; apply outcome will be read from the page: {e}")
+        return None
+    return ApplyWatch()
 
-            try:
-                salary_text = job.find_element(By.XPATH, ".//span[contains(@class,'sal-wrap')]").text.strip()
-            except Exception:
-                salary_text = "Not Disclosed"
+# ---------------- JOB PROCESSING ----------------
+def return_to_results():
+    """Close the detail tab (or navigate back) so the driver is on the results page again."""
+    try:
+        if tab_prefetcher and tab_prefetcher.current:
+            tab_prefetcher.close_current()
+        elif len(driver.window_handles) > 1:
+            driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+        elif RESULTS_IN_BROWSER:
+            driver.back()
+    except Exception:
+        pass
 
-            print(f"Found job: {title} | {company} | {salary_text} | ID: {job_id}")
-            logging.info(f"Found job: {job_id} | {title} | {company} | {salary_text}")
+def triage_card(card):
+    """
+    Apply the card-level checks (dedupe, Already Applied tag, card filters and reposts, relevance).
+    Returns a (job_id, title, company, salary_text, job_link) tuple for jobs worth opening, else None.
+    """
+    job_id = card["job_id"]
+    if not job_id:
+        return None
+    if str(job_id) in existing_job_ids:
+        # skip already processed
+        return None
+    if SHARED_DEDUPE and not claim_job(str(job_id)):
+        # taken by another query of this fan-out run
+        existing_job_ids.add(str(job_id))
+        return None
 
-            # If job card indicates Already Applied -> record and skip (do not increment)
-            try:
-                applied_tag = job.find_element(By.XPATH, ".//span[contains(text(),'Applied')]")
-                if applied_tag.is_displayed():
-                    save_record(job_id, title, company, salary_text, job_link, "Already Applied")
-                    logging.info(f"Card shows Already Applied for {job_id} — recorded and skipped")
-                    continue
-            except Exception:
-                pass
+    title = card["title"] or "Unknown Title"
+    job_link = card["link"] or "N/A"
+    company = card["company"] or "Unknown Company"
+    salary_text = card["salary"] or "Not Disclosed"
 
-            # Salary filter
-            max_sal = parse_max_salary(salary_text)
-            if (max_sal is not None) and (max_sal < MIN_EXPECTED_SALARY):
-                save_record(job_id, title, company, salary_text, job_link, "Skipped (Low Salary)")
-                logging.info(f"Skipped low salary job {job_id}: {salary_text}")
-                continue
+    print(f"Found job: {title} | {company} | {salary_text} | ID: {job_id}")
+    logging.info(f"Found job: {job_id} | {title} | {company} | {salary_text}")
 
-            # Open job detail (click title) - may open new tab
-            try:
-                if not safe_click(title_elem):
-                    try:
-                        title_elem.click()
-                    except Exception:
-                        save_record(job_id, title, company, salary_text, job_link, "Could not open job detail")
-                        continue
-                time.sleep(1)
-                if len(driver.window_handles) > 1:
-                    driver.switch_to.window(driver.window_handles[-1])
-                time.sleep(1)
-            except Exception as e:
-                logging.error(f"Error opening job detail for {job_id}: {e}", exc_info=True)
-                save_record(job_id, title, company, salary_text, job_link, f"Open detail error: {e}")
-                try:
-                    if len(driver.window_handles) > 1:
-                        driver.close()
-                        driver.switch_to.window(driver.window_handles[0])
-                except Exception:
-                    pass
-                continue
+    # If job card indicates Already Applied -> record and skip (do not increment)
+    if card["applied"]:
+        save_record(job_id, title, company, salary_text, job_link, "Already Applied")
+        logging.info(f"Card shows Already Applied for {job_id} — recorded and skipped")
+        return None
 
-            # find apply button on detail page (buttons or links containing 'apply')
-            apply_btn = None
-            try:
-                candidates = driver.find_elements(By.XPATH, "//button|//a")
-                for b in candidates:
-                    try:
-                        txt = (b.text or "").strip().lower()
-                        if "apply" in txt and b.is_displayed() and b.is_enabled():
-                            apply_btn = b
-                            break
-                    except Exception:
-                        continue
-            except Exception:
-                apply_btn = None
+    # Card filters (set by filter_page from FILTERS_FILE)
+    if card.get("reject"):
+        code, detail = card["reject"]
+        save_record(job_id, title, company, salary_text, job_link, FILTER_STATUS[code])
+        filter_stats[code] = filter_stats.get(code, 0) + 1
+        logging.info(f"Filtered job {job_id} [{code}]: {detail}")
+        return None
 
-            if not apply_btn:
-                save_record(job_id, title, company, salary_text, job_link, "No Apply Button")
-                logging.info(f"No apply button on detail for {job_id}")
-                # close detail tab if opened
-                if len(driver.window_handles) > 1:
-                    driver.close()
-                    driver.switch_to.window(driver.window_handles[0])
-                else:
-                    try:
-                        driver.back()
-                    except Exception:
-                        pass
-                continue
+    # Relevance filter (set by rank_page when scoring is enabled)
+    if card.get("relevant") is False:
+        save_record(job_id, title, company, salary_text, job_link, "Skipped (Low Relevance)")
+        logging.info(f"Skipped low relevance job {job_id}: score {card['score']:.3f}")
+        return None
 
-            btn_text = (apply_btn.text or "").strip().lower()
+    record_fingerprint(card)
+    return (str(job_id), title, company, salary_text, job_link)
 
-            # Skip company-site applies
-            if "company site" in btn_text or "apply on company" in btn_text:
-                save_record(job_id, title, company, salary_text, job_link, "Skipped (Company Site)")
-                logging.info(f"Skipped company-site job {job_id}")
-                if len(driver.window_handles) > 1:
-                    driver.close()
-                    driver.switch_to.window(driver.window_handles[0])
+def process_job(job, title_elem=None, preloaded=False):
+    """
+    Open one job's detail page, apply (answering the chatbot if needed) and record the outcome.
+    The detail is opened by clicking title_elem on the results page when given, else by URL;
+    preloaded means the current tab already holds it (see TabPrefetcher).
+    Returns the recorded status, or None if the job was left unrecorded: MAX_APPLY is reached, or the
+    detail page came back as a captcha, throttled or login page.
+    """
+    global current_job_id
+    current_job_id = job[0]
+    mark_in_flight(job, "opened")
+    job_sites.clear()
+    try:
+        with span("job", job[0]) as job_span:
+            commands_before = webdriver_commands
+            status = open_and_apply(job, title_elem, preloaded)
+            job_span["outcome"] = status or "not processed"
+            job_span["commands"] = webdriver_commands - commands_before
+        check_command_budget(job[0], job_span["commands"])
+        clear_in_flight(job[0])
+        return status
+    except WebDriverException:
+        watchdog.suspect = True
+        raise
+    finally:
+        current_job_id = None
+        watchdog.job_done()
+
+def open_and_apply(job, title_elem, preloaded=False):
+    job_id, title, company, salary_text, job_link = job
+
+    # Open job detail (click title) - may open new tab
+    if not preloaded:
+        pace("detail_open")
+    with span("detail_open"):
+        opened_at = time.monotonic()
+        try:
+            if not preloaded:
+                if title_elem is None:
+                    driver.get(job_link)
+                elif blocked_categories():
+                    # a clicked link starts loading before blocking can be installed in its tab
+                    open_in_new_tab(job_link)
                 else:
-                    try:
-                        driver.back()
-                    except Exception:
-                        pass
-                continue
-
-            # If button already says "Applied"
-            if "applied" in btn_text:
-                save_record(job_id, title, company, salary_text, job_link, "Already Applied")
-                logging.info(f"Detail shows Already Applied for {job_id}")
-                if len(driver.window_handles) > 1:
+                    handle_count = len(driver.window_handles)
+                    if not safe_click(title_elem):
+                        try:
+                            title_elem.click()
+                        except Exception as e:
+                            capture_failure("detail_open", job_id, e)
+                            save_record(job_id, title, company, salary_text, job_link, "Could not open job detail")
+                            return "Could not open job detail"
+                    wait_for("new_tab", handle_count, timeout=5)
+                    if len(driver.window_handles) > 1:
+                        driver.switch_to.window(driver.window_handles[-1])
+            ready = wait_for("detail_ready", timeout=10)
+            health = check_page_health(time.monotonic() - opened_at if ready else float("inf"))
+        except Exception as e:
+            if isinstance(e, WebDriverException):
+                watchdog.suspect = True
+            logging.error(f"Error opening job detail for {job_id}: {e}", exc_info=True)
+            capture_failure("detail_open", job_id, e)
+            save_record(job_id, title, company, salary_text, job_link, f"Open detail error: {e}")
+            try:
+                if preloaded:
+                    return_to_results()
+                elif len(driver.window_handles) > 1:
                     driver.close()
                     driver.switch_to.window(driver.window_handles[0])
-                else:
-                    try:
-                        driver.back()
-                    except Exception:
-                        pass
-                continue
+            except Exception:
+                pass
+            return f"Open detail error: {e}"
+
+    if health != "ok":
+        # captcha, throttled or logged-out page: the pacer has backed off; leave the job unrecorded for a retry
+        if health == "error":
+            watchdog.suspect = True
+        logging.warning(f"Detail page for {job_id} is a {health} page; leaving it for a later run.")
+        capture_failure("detail_health", job_id, health)
+        return_to_results()
+        return None
 
-            # Click apply
-            clicked = safe_click(apply_btn)
-            if not clicked:
-                try:
-                    apply_btn.click()
-                except Exception as e:
-                    save_record(job_id, title, company, salary_text, job_link, "No Apply Button / Not Clickable")
-                    logging.warning(f"Could not click apply for {job_id}: {e}")
-                    if len(driver.window_handles) > 1:
-                        driver.close()
-                        driver.switch_to.window(driver.window_handles[0])
-                    else:
-                        try:
-                            driver.back()
-                        except Exception:
-                            pass
-                    continue
+    # find apply button on detail page (buttons or links containing 'apply')
+    with span("apply_lookup") as lookup_span:
+        apply_btn, apply_kind = find_apply_button()
+        lookup_span["outcome"] = apply_kind or "none"
+
+    if not apply_btn:
+        save_record(job_id, title, company, salary_text, job_link, "No Apply Button")
+        logging.info(f"No apply button on detail for {job_id}")
+        capture_failure("apply_lookup", job_id, "no apply button")
+        # close detail tab if opened
+        return_to_results()
+        return "No Apply Button"
+
+    # Skip company-site applies
+    if apply_kind == "company_site":
+        save_record(job_id, title, company, salary_text, job_link, "Skipped (Company Site)")
+        logging.info(f"Skipped company-site job {job_id}")
+        return_to_results()
+        return "Skipped (Company Site)"
+
+    # If button already says "Applied"
+    if apply_kind == "applied":
+        if job_id in resumed_clicks:
+            # Our own click from the interrupted run went through; count it now
+            if reserve_apply_slot():
+                finish_apply_slot(True)
+            save_record(job_id, title, company, salary_text, job_link, "Applied Successfully")
+            logging.info(f"Recovered apply for {job_id} — total applied {applied_so_far()}")
+            return_to_results()
+            return "Applied Successfully"
+        save_record(job_id, title, company, salary_text, job_link, "Already Applied")
+        logging.info(f"Detail shows Already Applied for {job_id}")
+        return_to_results()
+        return "Already Applied"
+
+    # Reserve one of the MAX_APPLY slots before clicking (shared with other workers)
+    if not reserve_apply_slot():
+        logging.info(f"MAX_APPLY reached before applying to {job_id}; left unrecorded.")
+        return_to_results()
+        return None
 
-            # After clicking check for chatbot drawer (short wait)
-            time.sleep(1.5)
-            chatbot_shown = False
+    try:
+        return click_and_confirm(job, apply_btn)
+    except WebDriverException as e:
+        # renderer crash or lost session mid-apply: record it and let the watchdog replace the browser
+        logging.error(f"Browser failed while applying to {job_id}: {e}")
+        capture_failure("apply", job_id, e)
+        watchdog.suspect = True
+        save_record(job_id, title, company, salary_text, job_link, "Apply Error (browser)")
+        return_to_results()
+        return "Apply Error (browser)"
+    finally:
+        if apply_slot_held:
+            finish_apply_slot(False)
+
+def click_and_confirm(job, apply_btn):
+    """Click Apply (the MAX_APPLY slot is already reserved), handle a chatbot and record the confirmed outcome."""
+    job_id, title, company, salary_text, job_link = job
+
+    # Click apply
+    pace("apply_click")
+    mark_in_flight(job, "apply_clicked")
+    watch = start_apply_watch()
+    with span("apply_click"):
+        clicked = safe_click(apply_btn)
+        if not clicked:
             try:
-                # short explicit wait for chatbot drawer presence
-                small_wait = WebDriverWait(driver, 3)
-                small_wait.until(EC.presence_of_element_located((By.CLASS_NAME, "chatbot_DrawerContentWrapper")))
-                # if found and visible, mark present
-                chatbot_el = driver.find_element(By.CLASS_NAME, "chatbot_DrawerContentWrapper")
-                if chatbot_el and chatbot_el.is_displayed():
-                    chatbot_shown = True
-            except Exception:
-                chatbot_shown = False
-
-            if chatbot_shown:
-                # Try to answer chatbot questions instead of skipping
-                handled = answer_chatbot_and_submit(job_id, title, company, salary_text, job_link)
-                if not handled:
-                    # failed to handle chatbot -> record and continue
-                    save_record(job_id, title, company, salary_text, job_link, "Skipped (Chatbot)")
-                    logging.info(f"Chatbot appeared for {job_id} and could not be handled; skipped.")
-                    # close tab or go back
-                    try:
-                        if len(driver.window_handles) > 1:
-                            driver.close()
-                            driver.switch_to.window(driver.window_handles[0])
-                        else:
-                            driver.back()
-                    except Exception:
-                        pass
-                    continue
-                else:
-                    # chatbot closed - wait a bit
-                    time.sleep(1.2)
-
-            # No chatbot or handled - now check if apply succeeded or already applied
-            status = "Unknown"
+                apply_btn.click()
+            except Exception as e:
+                finish_apply_slot(False)
+                save_record(job_id, title, company, salary_text, job_link, "No Apply Button / Not Clickable")
+                logging.warning(f"Could not click apply for {job_id}: {e}")
+                capture_failure("apply_click", job_id, e)
+                return_to_results()
+                return "No Apply Button / Not Clickable"
+
+    # After clicking wait until the apply response arrives or the chatbot opens
+    # (without network confirmation: the chatbot opens, the Applied label shows, or the page settles)
+    if watch:
+        wait_for("apply_response", watch, timeout=APPLY_RESPONSE_TIMEOUT)
+        if watch.outcome:
+            # the apply request can answer before the chatbot renders
+            wait_for("apply_settled", timeout=3)
+    else:
+        wait_for("apply_settled", timeout=6)
+    try:
+        chatbot_shown = bool(driver.execute_script(CHATBOT_VISIBLE_JS))
+    except Exception:
+        chatbot_shown = False
+
+    if chatbot_shown:
+        # The click's response only opened the questionnaire: confirm from the final submit instead
+        watch = start_apply_watch()
+        # Try to answer chatbot questions instead of skipping
+        handled = answer_chatbot_and_submit(job_id, title, company, salary_text, job_link)
+        if not handled:
+            # failed to handle chatbot -> record and continue
+            finish_apply_slot(False)
+            save_record(job_id, title, company, salary_text, job_link, "Skipped (Chatbot)")
+            logging.info(f"Chatbot appeared for {job_id} and could not be handled; skipped.")
+            capture_failure("chatbot", job_id, "chatbot not handled")
+            # close tab or go back
+            return_to_results()
+            return "Skipped (Chatbot)"
+        if watch:
+            # the last answer submits the application
+            wait_for("apply_confirmed", watch, timeout=APPLY_RESPONSE_TIMEOUT)
+
+    # No chatbot or handled - the apply response decides, else the page
+    with span("status_check") as status_span:
+        if watch and watch.outcome:
+            ok, detail = watch.outcome
+            status = "Applied Successfully" if ok else f"Apply Failed ({detail})"
+            logging.info(f"Apply response for {job_id}: {'success' if ok else 'failure'} ({detail})")
+            if not ok:
+                capture_failure("apply_response", job_id, detail)
+        else:
+            if watch:
+                logging.warning(f"No apply response for {job_id} within {APPLY_RESPONSE_TIMEOUT:.0f}s; checking the page.")
+            status = "Applied (unconfirmed)"
             try:
                 # Try to locate apply/applied button again (DOM may have changed)
-                try:
-                    new_apply_btn = WebDriverWait(driver, 3).until(
-                        EC.presence_of_element_located((By.XPATH, "//button[contains(text(),'Apply') or contains(text(),'Applied')]"))
-                    )
-                except Exception:
-                    new_apply_btn = None
-
+                new_apply_btn = wait_for_element("apply_status", timeout=3, usable=False)
                 btn_text = ""
                 if new_apply_btn:
                     try:
                         btn_text = (new_apply_btn.text or "").strip().lower()
                     except Exception:
                         btn_text = ""
-
-                if "apply" == btn_text:
-                    # If still 'Apply' text, assume success for our flows
-                    status = "Applied Successfully"
-                    logging.info(f"Assuming applied for {job_id} (button still shows 'Apply').")
-                elif "applied" in btn_text:
+                if "applied" in btn_text:
                     status = "Applied Successfully"
                     logging.info(f"Detected Applied label for {job_id}")
                 else:
-                    # If we couldn't find a button, assume success if no errors
-                    status = "Applied Successfully"
+                    logging.info(f"Could not confirm apply for {job_id} (button text {btn_text!r}).")
             except Exception as e:
-                status = "Applied (unknown state)"
                 logging.warning(f"Error determining apply status for {job_id}: {e}")
+                capture_failure("status_check", job_id, e)
+        status_span["outcome"] = status
+
+    # Record result; an unconfirmed apply still uses up a MAX_APPLY slot
+    save_record(job_id, title, company, salary_text, job_link, status)
+    total = finish_apply_slot(status in APPLIED_STATUSES)
+    if status == "Applied Successfully":
+        logging.info(f"Applied to {job_id} — total applied {total}")
+    else:
+        logging.info(f"Processed {job_id} with status: {status}")
+
+    # close detail tab or navigate back to results
+    return_to_results()
+    return status
+
+def process_card_serial(job, card):
+    """Serial mode: open the job from its card on the current results page (or by URL when harvesting over HTTP)."""
+    if not RESULTS_IN_BROWSER:
+        process_job(job)
+        return
+    title_elem = find_card_title(card)
+    if title_elem is None:
+        save_record(*job, "Could not open job detail")
+        return
+    process_job(job, title_elem)
+    # back on the results page: make sure it is usable before the next card
+    wait_for("results_rendered", timeout=10)
+
+class TabPrefetcher:
+    """
+    Serial-mode pipeline that hides detail page loads: each candidate's page starts loading in a
+    background tab as soon as the card is triaged, and the oldest job is applied to once `depth`
+    pages are loading behind it. At most depth + 1 detail tabs are open. Window handles are tracked
+    here instead of being listed by WebDriver on every step.
+    """
 
-            # Record result
-            save_record(job_id, title, company, salary_text, job_link, status)
-            if status == "Applied Successfully":
-                applied_count += 1
-                logging.info(f"Applied to {job_id} — total applied {applied_count}")
+    def __init__(self, depth):
+        self.depth = depth
+        self.home = driver.current_window_handle  # results page (or the only tab when harvesting over HTTP)
+        self.known = set(driver.window_handles)
+        self.pending = deque()  # (job, handle or None) in triage order
+        self.current = None  # tab of the job being applied to
+
+    def submit(self, job, card):
+        """handle_job for the crawl: start loading the job, then apply to whatever is due."""
+        existing_job_ids.add(job[0])  # a later page must not hand out the same id again
+        mark_in_flight(job, "queued")
+        with span("prefetch_open"):
+            self.pending.append((job, self.open_tab(job[4])))
+        while len(self.pending) > self.depth:
+            self.process_next()
+
+    def flush(self):
+        while self.pending:
+            self.process_next()
+
+    def open_tab(self, url):
+        """Open url in a background tab without leaving the current one; returns its handle or None."""
+        pace("prefetch_open")
+        try:
+            if blocked_categories():
+                # blocking must be in the tab before it loads: open it empty, block, navigate, come back
+                driver.switch_to.new_window("tab")
+                new = [driver.current_window_handle]
+                apply_resource_blocking()
+                driver.execute_script("location.href = arguments[0];", url)
+                driver.switch_to.window(self.home)
             else:
-                logging.info(f"Processed {job_id} with status: {status}")
+                driver.execute_script("window.open(arguments[0], '_blank');", url)
+                new = [h for h in driver.window_handles if h not in self.known]
+        except WebDriverException as e:
+            logging.warning(f"Could not prefetch {url}: {e}")
+            try:
+                driver.switch_to.window(self.home)
+            except WebDriverException:
+                pass
+            return None
+        self.known.update(new)
+        return new[-1] if new else None
+
+    def process_next(self):
+        job, handle = self.pending.popleft()
+        if applied_so_far() >= MAX_APPLY:
+            # left unrecorded, as when the card loop stops at MAX_APPLY
+            if handle:
+                self.close_tab(handle)
+            clear_in_flight(job[0])
+            return
+        try:
+            if handle:
+                driver.switch_to.window(handle)
+            else:
+                handle = open_in_new_tab(job[4])
+                self.known.add(handle)
+            self.current = handle
+            process_job(job, preloaded=True)
+        finally:
+            if self.current:
+                self.close_current()
+
+    def close_current(self):
+        handle, self.current = self.current, None
+        self.close_tab(handle)
+
+    def close_tab(self, handle):
+        """Close one detail tab and go back to the home tab."""
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except WebDriverException:
+            pass
+        self.known.discard(handle)
+        driver.switch_to.window(self.home)
+
+tab_prefetcher = None  # set while a serial crawl runs with PREFETCH_TABS
+
+# ---------------- BROWSER WATCHDOG ----------------
+# One Chrome serving a long run keeps growing. Between jobs the watchdog samples the browser's process-tree
+# RSS (from /proc, so Linux only) and the results tab's JS heap. When a threshold is crossed it swaps in a
+# fresh browser with the same cookies, back on the same results page, so the crawl carries on. A browser
+# that died is replaced the same way instead of failing the run.
+RECYCLE_MAX_RSS_MB = float(os.getenv("RECYCLE_MAX_RSS_MB", "3000"))  # Chrome process tree; 0 = off
+RECYCLE_MAX_HEAP_MB = float(os.getenv("RECYCLE_MAX_HEAP_MB", "768"))  # JS heap of the results tab; 0 = off
+RECYCLE_EVERY_JOBS = int(os.getenv("RECYCLE_EVERY_JOBS", "200"))  # jobs per browser; 0 = off
+WATCHDOG_SAMPLE_JOBS = int(os.getenv("WATCHDOG_SAMPLE_JOBS", "5"))  # jobs between memory samples
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def browser_pids():
+    """Pid of chromedriver and of every process under it (Chrome and its renderers); empty without /proc."""
+    try:
+        root = driver.service.process.pid
+        entries = os.listdir("/proc")
+    except Exception:
+        return []
+    children = {}
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    pids, stack = [], [root]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+def browser_rss_mb():
+    """Resident memory of the browser's process tree in MB, or None when it cannot be read."""
+    total = 0
+    for pid in browser_pids():
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            continue
+    return total / 2**20 if total else None
+
+def js_heap_mb():
+    """Used JS heap of the current tab in MB, or None."""
+    try:
+        return driver.execute_cdp_cmd("Runtime.getHeapUsage", {})["usedSize"] / 2**20
+    except Exception:
+        return None
 
-            # close detail tab or navigate back to results
+def mb(value):
+    return "n/a" if value is None else f"{value:.0f} MB"
+
+class BrowserWatchdog:
+    """Jobs handled and memory samples for the current browser, and the decision to replace it."""
+
+    def __init__(self):
+        self.jobs = 0  # jobs handled by the current browser
+        self.sampled_at = 0  # self.jobs at the last memory sample
+        self.total_jobs = 0
+        self.cookies = []  # last known login cookies, for replacing a browser that died
+        self.curve = []  # (total jobs, rss MB, heap MB) per sample
+        self.recycles = {}  # reason -> count
+        self.suspect = False  # a job hit a browser error: check the browser before the next one
+
+    def job_done(self):
+        self.jobs += 1
+        self.total_jobs += 1
+
+    def reset(self):
+        self.jobs = self.sampled_at = 0
+        self.suspect = False
+
+    def check(self):
+        """Returns the reason to replace the browser now ("crashed", "jobs", "rss", "heap"), or None."""
+        # liveness costs a round trip: check at the sampling cadence, or right after a browser error
+        due = self.jobs - self.sampled_at >= WATCHDOG_SAMPLE_JOBS
+        if (due or self.suspect) and not browser_alive():
+            return "crashed"
+        self.suspect = False
+        if RECYCLE_EVERY_JOBS and self.jobs >= RECYCLE_EVERY_JOBS:
+            return "jobs"
+        if not self.cookies or self.jobs - self.sampled_at >= WATCHDOG_SAMPLE_JOBS:
             try:
-                if len(driver.window_handles) > 1:
-                    driver.close()
-                    driver.switch_to.window(driver.window_handles[0])
-                else:
-                    driver.back()
-            except Exception:
+                self.cookies = driver.get_cookies()
+            except WebDriverException:
                 pass
+        if not self.jobs or self.jobs - self.sampled_at < WATCHDOG_SAMPLE_JOBS:
+            return None
+        self.sampled_at = self.jobs
+        rss, heap = browser_rss_mb(), js_heap_mb()
+        self.curve.append((self.total_jobs, rss, heap))
+        logging.info(f"Browser memory after {self.jobs} jobs ({self.total_jobs} this run): rss {mb(rss)}, heap {mb(heap)}")
+        if SPANS_FILE:
+            record_span("memory", time.time(), 0, outcome=f"{self.jobs} jobs", rss_mb=rss and round(rss), heap_mb=heap and round(heap))
+        if RECYCLE_MAX_RSS_MB and rss and rss >= RECYCLE_MAX_RSS_MB:
+            return "rss"
+        if RECYCLE_MAX_HEAP_MB and heap and heap >= RECYCLE_MAX_HEAP_MB:
+            return "heap"
+        return None
+
+watchdog = BrowserWatchdog()
+
+def browser_alive():
+    try:
+        driver.window_handles
+        return True
+    except Exception:
+        return False
+
+def recycle_browser():
+    """Quit Chrome (ignoring errors from one that already died) and start a fresh instance."""
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    start_browser()
+    watchdog.reset()
 
-            # short human-like delay
-            time.sleep(1.2)
+def watch_browser(results_url=None):
+    """
+    Call between jobs, with nothing half-done in the browser. Replaces the browser if it died or crossed
+    a threshold, restores the login cookies and reopens results_url (the page the crawl is on).
+    """
+    reason = watchdog.check()
+    if not reason:
+        return
+    cookies = watchdog.cookies
+    if reason != "crashed":
+        if tab_prefetcher:
+            tab_prefetcher.flush()  # finish the jobs already loading in background tabs
+        try:
+            cookies = driver.get_cookies()
+        except WebDriverException:
+            pass
+    logging.warning(f"Recycling browser ({reason}) after {watchdog.jobs} jobs")
+    print(f"Restarting Chrome ({reason}) after {watchdog.jobs} jobs...")
+    watchdog.recycles[reason] = watchdog.recycles.get(reason, 0) + 1
+    with span("browser_recycle") as recycle_span:
+        recycle_span["outcome"] = reason
+        recycle_browser()
+        restore_cookies(cookies)
+        if results_url:
+            driver.get(results_url)
+            wait_for("results_rendered", timeout=15)
+    if tab_prefetcher:
+        # a crashed browser took its background tabs along: those jobs are reopened by URL
+        tab_prefetcher.home = driver.current_window_handle
+        tab_prefetcher.known = set(driver.window_handles)
+        tab_prefetcher.pending = deque((job, None) for job, handle in tab_prefetcher.pending)
+    logging.info(f"Browser recycled; rss now {mb(browser_rss_mb())}")
+
+def log_watchdog_summary():
+    if not watchdog.curve and not watchdog.recycles:
+        return
+    rss = [r for _, r, _ in watchdog.curve if r is not None]
+    heap = [h for _, _, h in watchdog.curve if h is not None]
+    logging.info(
+        f"Browser watchdog: {watchdog.total_jobs} jobs, recycles {watchdog.recycles or 'none'}, "
+        f"peak rss {mb(max(rss) if rss else None)}, peak heap {mb(max(heap) if heap else None)}, "
+        f"curve (jobs: rss/heap MB) " + ", ".join(
+            f"{jobs}: {r and round(r)}/{h and round(h)}" for jobs, r, h in watchdog.curve
+        )
+    )
+
+# ---------------- RESULT PAGES ----------------
+LINK_TEXTS_JS = "return arguments[0].map(function (a) { return [(a.innerText || '').trim(), a.href || null]; });"
+
+def crawl_results(handle_job, page_num=1, visited_pages=()):
+    """
+    Walk the result pages from the one the browser is on, triage every card and hand candidate jobs
+    to handle_job(job, card). page_num and visited_pages carry over a resumed crawl.
+    """
+    visited_pages = set(visited_pages)
+
+    while applied_so_far() < MAX_APPLY:
+        logging.info(f"Processing page {page_num}")
+        print(f"\n--- Processing page {page_num} --- (applied so far: {applied_so_far()})")
+        current_url = driver.current_url
+        if current_url in visited_pages:
+            logging.info("Already visited this page URL; stopping to avoid loop.")
+            mark_crawl_complete()
+            break
+        save_checkpoint(page_num, current_url, visited_pages)
+        visited_pages.add(current_url)
+
+        with span("card_extraction") as extract_span:
+            cards = extract_job_cards()
+            extract_span["outcome"] = f"{len(cards)} cards"
+        if not cards:
+            health = check_page_health()
+            if health != "ok":
+                # a captcha, throttled or login page hides the results; the crawl did not reach their end
+                logging.warning(f"Page {page_num} is a {health} page; stopping before the end of the results.")
+                print(f"Page {page_num} did not load properly ({health}); ending.")
+                break
+            logging.info("No job cards found on this page. Ending.")
+            print("No job cards found on this page. Ending.")
+            mark_crawl_complete()
+            break
+        cards, caught_up = incremental_cut(cards)
+        with span("card_filter") as filter_span:
+            filter_span["outcome"] = f"{filter_page(cards)} rejected"
+        cards = rank_page(cards)
+
+        for card in cards:
+            if applied_so_far() >= MAX_APPLY:
+                break
+            job = triage_card(card)
+            if job:
+                handle_job(job, card)
+                watch_browser(current_url)
+        if caught_up:
+            log_caught_up(page_num)
+            break
 
         # ---------- PAGINATION ----------
-        if applied_count >= MAX_APPLY:
+        if applied_so_far() >= MAX_APPLY:
             logging.info(f"Reached MAX_APPLY ({MAX_APPLY}). Ending.")
             break
 
-        logging.info("Attempting pagination (numbered pages -> Next fallback)")
-        # Try numbered pages first (div.lastCompMark -> div.styles_pages__v1rAK a)
-        next_clicked = False
-        try:
-            pagination_container = driver.find_element(By.CSS_SELECTOR, "div.lastCompMark div.styles_pages__v1rAK")
-            links = pagination_container.find_elements(By.TAG_NAME, "a")
-            # build mapping number->href for numeric links
-            page_map = {}
-            for link in links:
-                txt = (link.text or "").strip()
-                href = link.get_attribute("href")
-                if txt.isdigit() and href:
-                    try:
-                        num = int(txt)
-                        page_map[num] = href
-                    except Exception:
-                        continue
-            # prefer page_num+1 if available, else smallest > page_num
-            target_href = None
-            if (page_num + 1) in page_map:
-                target_href = page_map[page_num + 1]
-            else:
-                greater = [n for n in sorted(page_map.keys()) if n > page_num]
-                if greater:
-                    target_href = page_map[greater[0]]
-            if target_href:
-                logging.info(f"Going to next numeric page: {target_href}")
-                driver.get(target_href)
-                # wait until URL changes (safety)
-                try:
-                    WebDriverWait(driver, 8).until(lambda d: d.current_url != current_url)
-                except Exception:
-                    logging.info("URL didn't change after numeric page click; continuing anyway.")
-                page_num += 1
-                time.sleep(3)
-                next_clicked = True
-        except Exception:
+        pace("pagination")
+        with span("pagination"):
+            paged_at = time.monotonic()
+            logging.info("Attempting pagination (numbered pages -> Next fallback)")
+            # Try numbered pages first (page_numbers chain), then the Next link
             next_clicked = False
-
-        if not next_clicked:
-            # Fallback to Next link/button
             try:
-                next_btn = driver.find_element(By.XPATH, "//a[contains(text(),'Next') or contains(., 'Next')]")
-                if safe_click(next_btn) or True:
-                    try:
-                        WebDriverWait(driver, 8).until(lambda d: d.current_url != current_url)
-                    except Exception:
-                        logging.info("URL didn't change after Next click")
+                links = locate("page_numbers", all=True)
+                # build mapping number->href for numeric links (text and href of every link in one call)
+                page_map = {}
+                for txt, href in driver.execute_script(LINK_TEXTS_JS, links) if links else []:
+                    if txt.isdigit() and href:
+                        try:
+                            num = int(txt)
+                            page_map[num] = href
+                        except Exception:
+                            continue
+                # prefer page_num+1 if available, else smallest > page_num
+                target_href = None
+                if (page_num + 1) in page_map:
+                    target_href = page_map[page_num + 1]
+                else:
+                    greater = [n for n in sorted(page_map.keys()) if n > page_num]
+                    if greater:
+                        target_href = page_map[greater[0]]
+                if target_href:
+                    if INCREMENTAL:
+                        target_href = freshness_url(target_href)
+                    logging.info(f"Going to next numeric page: {target_href}")
+                    driver.get(target_href)
+                    # wait until URL changes (safety)
+                    if not wait_for("url_changed", current_url, timeout=8):
+                        logging.info("URL didn't change after numeric page click; continuing anyway.")
                     page_num += 1
-                    time.sleep(3)
+                    wait_for("results_rendered", timeout=15)
                     next_clicked = True
             except Exception:
                 next_clicked = False
 
+            if not next_clicked:
+                # Fallback to Next link/button
+                try:
+                    next_btn = locate("next_page")
+                    if next_btn and (safe_click(next_btn) or True):
+                        if not wait_for("url_changed", current_url, timeout=8):
+                            logging.info("URL didn't change after Next click")
+                        page_num += 1
+                        wait_for("results_rendered", timeout=15)
+                        next_clicked = True
+                except Exception:
+                    next_clicked = False
+
         if not next_clicked:
             logging.info("No next page found; ending pagination.")
             print("No next page found; ending.")
+            mark_crawl_complete()
+            break
+        health = check_page_health(time.monotonic() - paged_at)
+        if health != "ok":
+            # the next page did not load as results; stop here without completing the crawl
+            logging.warning(f"Page {page_num} is a {health} page after pagination; stopping.")
+            print(f"Page {page_num} did not load properly ({health}); ending.")
+            break
+
+# ---------------- HTTP HARVESTER ----------------
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+class JobCardParser(HTMLParser):
+    """Collects job cards from a results page's HTML into the same records as extract_job_cards()."""
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.cards = []
+        self._stack = []
+        self._card = None
+        self._card_depth = 0
+        self._field = None  # (name, depth) of the element whose text is being captured
+        self._text = []
+        self._tags_depth = 0  # depth of the open <ul class="...tags..."> inside the card, if any
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        self._stack.append(tag)
+        attrs = dict(attrs)
+        cls = attrs.get("class") or ""
+        if self._card is None:
+            if tag == "div" and ("srp-jobtuple-wrapper" in cls or "jobTuple" in cls):
+                self._card = {
+                    "index": len(self.cards), "job_id": attrs.get("data-job-id"), "title": None,
+                    "link": None, "company": None, "salary": None, "experience": None, "location": None,
+                    "posted": None, "snippet": None, "tags": [], "applied": False,
+                }
+                self._card_depth = len(self._stack)
+            return
+        if tag == "ul" and "tags" in cls:
+            self._tags_depth = len(self._stack)
+        if self._field is not None:
+            return
+        field = None
+        if tag == "a" and "title" in cls and self._card["title"] is None:
+            field = "title"
+            if attrs.get("href"):
+                self._card["link"] = urljoin(self.base_url, attrs["href"])
+        elif tag == "a" and ("comp-name" in cls or "subTitle" in cls) and self._card["company"] is None:
+            field = "company"
+        elif tag == "span" and "sal-wrap" in cls and self._card["salary"] is None:
+            field = "salary"
+        elif tag == "span" and "exp-wrap" in cls and self._card["experience"] is None:
+            field = "experience"
+        elif tag == "span" and "loc-wrap" in cls and self._card["location"] is None:
+            field = "location"
+        elif tag == "span" and "job-post-day" in cls and self._card["posted"] is None:
+            field = "posted"
+        elif "job-desc" in cls and self._card["snippet"] is None:
+            field = "snippet"
+        elif tag == "li" and self._tags_depth and len(self._stack) > self._tags_depth:
+            field = "tags"
+        if field:
+            self._field = (field, len(self._stack))
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS or tag not in self._stack:
+            return
+        while self._stack and self._stack.pop() != tag:
+            pass
+        if self._field and len(self._stack) < self._field[1]:
+            value = " ".join("".join(self._text).split()) or None
+            if self._field[0] == "tags":
+                if value:
+                    self._card["tags"].append(value)
+            else:
+                self._card[self._field[0]] = value
+            self._field = None
+        if self._tags_depth and len(self._stack) < self._tags_depth:
+            self._tags_depth = 0
+        if self._card and len(self._stack) < self._card_depth:
+            self.cards.append(self._card)
+            self._card = None
+
+    def handle_data(self, data):
+        if self._field:
+            self._text.append(data)
+        if self._card and self._stack and self._stack[-1] == "span" and "Applied" in data:
+            self._card["applied"] = True
+
+def build_search_url(skills, experience, page=1):
+    """Naukri's results URL for a keyword search, e.g. /java-spring-boot-jobs-2?k=Java, Spring Boot&experience=11."""
+    slug = re.sub(r"[^a-z0-9]+", "-", (skills or "").lower()).strip("-")
+    path = f"{slug}-jobs" + (f"-{page}" if page > 1 else "")
+    params = {"k": skills}
+    if experience:
+        params["experience"] = experience
+    return f"{BASE_URL}{path}?{urlencode(params)}"
+
+def make_http_session(cookies=()):
+    """Pooled keep-alive HTTP session that presents the browser's cookies and user agent."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    for cookie in cookies:
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+    return session
+
+# The HTTP counterpart of PAGE_HEALTH_JS, for a page without cards
+CAPTCHA_HTML_RE = re.compile(r"captcha|are you a robot|unusual traffic", re.I)
+
+class PageHealthError(requests.RequestException):
+    """A results page that came back as a login, captcha or error page instead of results."""
+
+    def __init__(self, health, url):
+        super().__init__(f"{health} page at {url}")
+        self.health = health
+
+def fetch_job_cards(session, url):
+    """Fetch one results page over HTTP and parse its cards. Raises PageHealthError for a login or captcha page."""
+    resp = session.get(url, timeout=20)
+    resp.raise_for_status()
+    parser = JobCardParser(resp.url)
+    parser.feed(resp.text)
+    parser.close()
+    if not parser.cards:
+        if "nlogin" in urlsplit(resp.url).path:
+            raise PageHealthError("login", resp.url)
+        if CAPTCHA_HTML_RE.search(resp.text[:20000]):
+            raise PageHealthError("captcha", resp.url)
+    return parser.cards
+
+def harvest_http(handle_job, first_page=1):
+    """
+    Read result pages over HTTP and hand candidate jobs to handle_job(job, card); Selenium only applies.
+    Falls back to the browser crawl if the first page has no server-rendered cards.
+    """
+    global RESULTS_IN_BROWSER
+    RESULTS_IN_BROWSER = False
+    session = make_http_session(driver.get_cookies())
+    seen_ids = set()
+    for page_num in range(first_page, HARVEST_MAX_PAGES + 1):
+        if applied_so_far() >= MAX_APPLY:
+            logging.info(f"Reached MAX_APPLY ({MAX_APPLY}). Ending.")
+            break
+        url = build_search_url(SKILLS, EXPERIENCE, page_num)
+        if INCREMENTAL:
+            url = freshness_url(url)
+        save_checkpoint(page_num, url, ())
+        print(f"\n--- Harvesting page {page_num} over HTTP --- (applied so far: {applied_so_far()})")
+        pace("page_harvest")
+        with span("page_harvest") as harvest_span:
+            fetched_at = time.monotonic()
+            try:
+                cards = fetch_job_cards(session, url)
+                health = "ok"
+            except requests.RequestException as e:
+                logging.warning(f"HTTP harvest of {url} failed: {e}")
+                cards = []
+                health = getattr(e, "health", "error")
+            if pacer:
+                pacer.observe(health, time.monotonic() - fetched_at)
+            harvest_span["outcome"] = f"{len(cards)} cards" if health == "ok" else health
+        logging.info(f"HTTP harvest page {page_num}: {len(cards)} cards from {url}")
+        if health != "ok":
+            # a failed fetch is not the end of the results: leave the crawl incomplete
+            print(f"Page {page_num} could not be read ({health}); ending.")
             break
 
-    # Main loop done
-    logging.info(f"Completed. Total applied: {applied_count}")
-    print(f"\nDone. Applied {applied_count} jobs. Excel: {EXCEL_FILE}")
+        if not cards and page_num == 1:
+            logging.info("No server-rendered cards over HTTP; falling back to browser crawl.")
+            RESULTS_IN_BROWSER = True
+            run_search()
+            crawl_results(handle_job)
+            return
+        page_ids = {card["job_id"] for card in cards if card["job_id"]}
+        if not page_ids or page_ids <= seen_ids:
+            logging.info("No new job cards on this page. Ending.")
+            mark_crawl_complete()
+            break
+        seen_ids |= page_ids
+
+        cards, caught_up = incremental_cut(cards)
+        with span("card_filter") as filter_span:
+            filter_span["outcome"] = f"{filter_page(cards)} rejected"
+        for card in rank_page(cards):
+            if applied_so_far() >= MAX_APPLY:
+                break
+            job = triage_card(card)
+            if job:
+                handle_job(job, card)
+                watch_browser()
+        if caught_up:
+            log_caught_up(page_num)
+            break
+
+def start_crawl(handle_job, checkpoint=None):
+    """Run the configured harvester, from the checkpointed page when resuming an interrupted run."""
+    if HARVEST_MODE == "http":
+        harvest_http(handle_job, checkpoint["page_num"] if checkpoint else 1)
+    elif checkpoint:
+        driver.get(checkpoint["page_url"])
+        wait_for("results_rendered", timeout=15)
+        crawl_results(handle_job, checkpoint["page_num"], checkpoint["visited_pages"])
+    else:
+        crawl_results(handle_job)
+
+# ---------------- WORKER POOL ----------------
+def init_worker(cookies, budget):
+    """Per-process setup: own ledger connection and browser, logged in with the shared cookies."""
+    global RESULTS_IN_BROWSER, ledger, apply_budget
+    RESULTS_IN_BROWSER = False
+    apply_budget = budget
+    ledger = open_ledger(LEDGER_FILE)
+    start_browser()
+    restore_cookies(cookies)
+    watchdog.cookies = cookies
+
+def worker_main(tasks, cookies, budget):
+    """Worker process loop: take jobs from the queue until the None sentinel arrives."""
+    init_worker(cookies, budget)
     try:
-        wb.save(EXCEL_FILE)
-    except Exception:
-        logging.warning("Failed to save Excel at final step.")
-    driver.quit()
+        while True:
+            job = tasks.get()
+            if job is None:
+                break
+            if applied_so_far() >= MAX_APPLY:
+                # left unrecorded, as when the card loop stops at MAX_APPLY
+                clear_in_flight(job[0])
+                continue
+            try:
+                process_job(job)
+            except Exception as e:
+                logging.exception(f"Worker failed on job {job[0]}")
+                capture_failure("worker", job[0], e)
+                save_record(*job, f"Worker error: {e}")
+                clear_in_flight(job[0])
+                return_to_results()
+            watch_browser()
+    finally:
+        finish_process()
+
+def run_worker_pool(ctx, cookies, checkpoint=None):
+    """Coordinator: harvest cards in this browser and dispatch candidates to WORKERS Chrome processes."""
+    # Bounded queue keeps harvesting only a little ahead of the workers
+    tasks = ctx.Queue(maxsize=WORKERS * 2)
+    workers = [
+        ctx.Process(target=worker_main, args=(tasks, cookies, apply_budget), name=f"worker-{i + 1}")
+        for i in range(WORKERS)
+    ]
+    for proc in workers:
+        proc.start()
+    logging.info(f"Started {WORKERS} worker processes")
+
+    def put_task(item):
+        # Never block forever on a full queue if every worker has died
+        while True:
+            try:
+                tasks.put(item, timeout=5)
+                return
+            except queue.Full:
+                if not any(proc.is_alive() for proc in workers):
+                    raise RuntimeError("All worker processes exited")
+
+    def dispatch(job, card):
+        # Mark as taken here so a later page can't dispatch the same id again
+        existing_job_ids.add(job[0])
+        mark_in_flight(job, "queued")
+        put_task(job)
 
-except Exception as fatal:
-    logging.exception("Fatal error during script execution")
-    print(f"Fatal error: {fatal}. See naukri_log.txt and screenshots.")
     try:
-        driver.save_screenshot("fatal_error.png")
-    except Exception:
-        pass
+        start_crawl(dispatch, checkpoint)
+    finally:
+        for _ in workers:
+            try:
+                put_task(None)
+            except RuntimeError:
+                break
+        for proc in workers:
+            proc.join()
+
+# ---------------- QUERY FAN-OUT ----------------
+# QUERIES_FILE declares several searches, optionally grouped into profiles (own account and MAX_APPLY):
+#   {"profiles": [{"name": "main", "max_apply": 30,
+#                  "queries": [{"skills": "Java, Spring Boot", "experience": "11"}, {"skills": "Java, Kafka"}]}]}
+# A plain list of queries is one profile with the configured account. Every query runs in its own
+# process and browser; all of them share the ledger and claim each job atomically before touching it.
+SHARED_DEDUPE = False  # True in fan-out query processes
+
+def claim_job(job_id):
+    """Atomically take job_id for this run. False if another process of the same run already has it."""
     try:
-        wb.save(EXCEL_FILE)
-    except Exception:
-        pass
-finally:
+        with ledger:
+            cur = ledger.execute(
+                "INSERT INTO claims (job_id, run_id) VALUES (?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET run_id = excluded.run_id, claimed_at = datetime('now') "
+                "WHERE claims.run_id != excluded.run_id",
+                (job_id, RUN_ID),
+            )
+        return cur.rowcount == 1
+    except sqlite3.Error as e:
+        logging.warning(f"Could not claim {job_id}: {e}")
+        return False
+
+def prune_claims():
+    """Drop the claims of earlier runs: they only matter while the run that made them is going."""
     try:
-        if driver:
+        with ledger:
+            ledger.execute("DELETE FROM claims WHERE run_id != ?", (RUN_ID,))
+    except sqlite3.Error as e:
+        logging.warning(f"Could not prune old claims: {e}")
+
+def load_query_plan():
+    """Profiles from QUERIES_FILE, each with a non-empty "queries" list; [] when there is no file."""
+    if not QUERIES_FILE or not os.path.exists(QUERIES_FILE):
+        return []
+    try:
+        with open(QUERIES_FILE) as f:
+            config = json.load(f)
+    except Exception as e:
+        logging.warning(f"Could not read queries {QUERIES_FILE}: {e}")
+        return []
+    if isinstance(config, list):
+        config = {"queries": config}
+    profiles = config.get("profiles") or [{"queries": config.get("queries") or []}]
+    for i, profile in enumerate(profiles):
+        profile.setdefault("name", f"profile{i + 1}")
+        # A profile with its own account keeps its own saved session
+        if profile.get("email") and not profile.get("session_file") and SESSION_FILE:
+            profile["session_file"] = f"naukri_session_{profile['name']}.json"
+    return [p for p in profiles if p.get("queries")]
+
+def query_main(cookies, budget):
+    """Fan-out process: run one query (from the environment) in its own browser against the profile's budget."""
+    global SHARED_DEDUPE, ledger, apply_budget, existing_job_ids
+    SHARED_DEDUPE = True
+    apply_budget = budget
+    ledger = open_ledger(LEDGER_FILE)
+    existing_job_ids = {row[0] for row in ledger.execute("SELECT DISTINCT job_id FROM jobs")}
+    try:
+        start_browser()
+        restore_cookies(cookies)
+        search_and_crawl(multiprocessing.get_context("spawn"))
+    except Exception as e:
+        logging.exception(f"Query {SKILLS!r} failed")
+        capture_failure("fatal", error=e)
+    finally:
+        finish_process()
+
+def run_fanout(ctx, plan):
+    """
+    Log in once per profile in this browser, then run every query of every profile concurrently.
+    Each profile's queries share one apply budget. Returns the total applied across profiles.
+    """
+    budgets = []
+    processes = []
+    prune_claims()
+    for i, profile in enumerate(plan):
+        settings = {k: v for k, v in profile.items() if k != "queries"}
+        with run_settings(settings):
+            if i:
+                driver.delete_all_cookies()
+            log_in()
+            cookies = driver.get_cookies()
+            budget = ctx.Array("i", 2)
+            budgets.append(budget)
+            for query in profile["queries"]:
+                # Spawned processes read their query and profile settings from the environment
+                with run_settings(query):
+                    proc = ctx.Process(target=query_main, args=(cookies, budget),
+                                       name=f"{profile['name']}:{SKILLS}:{EXPERIENCE or ''}")
+                    proc.start()
+                processes.append(proc)
+        logging.info(f"Profile {profile['name']}: {len(profile['queries'])} queries, max apply {profile.get('max_apply', MAX_APPLY)}")
+    print(f"Running {len(processes)} queries across {len(plan)} profiles")
+    for proc in processes:
+        proc.join()
+    for profile, budget in zip(plan, budgets):
+        logging.info(f"Profile {profile['name']}: applied {budget[0]}")
+    return sum(budget[0] for budget in budgets)
+
+# ---------------- MAIN FLOW ----------------
+def finish_process(close=True):
+    """
+    End of a run in this process (main, worker or fan-out query): summary logs, learned state saved,
+    failure artifacts written. close=False keeps the browser and ledger for the next daemon run.
+    """
+    log_wait_summary()
+    log_chatbot_summary()
+    log_filter_summary()
+    log_pace_summary()
+    log_selector_summary()
+    log_watchdog_summary()
+    log_command_summary()
+    selector_registry.save()
+    save_relevance_model()
+    save_answer_cache()
+    flush_artifacts()
+    if close:
+        try:
             driver.quit()
-    except Exception:
-        pass
-    logging.info("Script finished (final).")
+        except Exception:
+            pass
+        ledger.close()
+
+def reset_run_state():
+    """Start a fresh run in this process: zero the apply budget and the per-run stats, reread card filters."""
+    global RESULTS_IN_BROWSER, card_rules
+    apply_budget[0] = apply_budget[1] = 0
+    RESULTS_IN_BROWSER = True
+    card_rules = None
+    wait_stats.clear()
+    filter_stats.clear()
+    resumed_clicks.clear()
+    for key, value in chatbot_stats.items():
+        chatbot_stats[key] = {} if isinstance(value, dict) else 0
+
+# NAUKRI_EMAIL the browser was last logged in as (None before the first login)
+session_account = None
+
+def log_in(warm=False):
+    """
+    Make sure the browser is logged in: keep a warm session, else reuse the saved one, else log in.
+    When NAUKRI_EMAIL has changed since the last login, the old account is signed out first.
+    """
+    global session_account
+    with span("login") as login_span:
+        if session_account is not None and session_account != NAUKRI_EMAIL:
+            # the other account's cookies would pass every session check
+            logging.info("Switching Naukri account; clearing the current session")
+            clear_browser_session()
+            warm = False
+        if warm and session_alive():
+            login_span["outcome"] = "warm session"
+        elif restore_session():
+            login_span["outcome"] = "session reused"
+        else:
+            login()
+        session_account = NAUKRI_EMAIL
+
+def clear_browser_session():
+    try:
+        driver.delete_all_cookies()
+        driver.execute_script("localStorage.clear();")
+    except WebDriverException as e:
+        logging.debug(f"Could not clear the browser session: {e}")
+
+def session_alive():
+    """True if the running browser is still logged in (usually the case for a warm daemon browser)."""
+    try:
+        driver.get(SESSION_CHECK_URL)
+    except WebDriverException:
+        return False
+    return wait_for("logged_in", timeout=5)
+
+def search_and_crawl(ctx):
+    """Search (or resume from the checkpoint) and work through the result pages, serially or with the pool."""
+    global tab_prefetcher
+    checkpoint = load_checkpoint() if RESUME else None
+    if INCREMENTAL:
+        load_watermark()
+    if checkpoint:
+        with apply_budget.get_lock():
+            # max(): the queries of a fan-out profile each saved the profile's count
+            apply_budget[0] = max(apply_budget[0], checkpoint["applied_count"])
+        print(f"Resuming run {checkpoint['run_id']} at page {checkpoint['page_num']} "
+              f"(applied so far: {checkpoint['applied_count']})")
+        logging.info(f"Resuming run {checkpoint['run_id']} from checkpoint: {checkpoint['page_url']}")
+        with span("resume") as resume_span:
+            resume_span["outcome"] = f"{recover_in_flight()} in-flight jobs"
+    else:
+        # the in-flight jobs of a run whose checkpoint expired or was cleared still need settling
+        with span("resume") as resume_span:
+            resume_span["outcome"] = f"{recover_in_flight(reopen=RESUME)} stale in-flight jobs"
+        if HARVEST_MODE != "http":
+            with span("search"):
+                run_search()
+
+    print(f"Starting job processing (target apply count = {MAX_APPLY}, workers = {WORKERS})")
+    if WORKERS > 1:
+        run_worker_pool(ctx, driver.get_cookies(), checkpoint)
+    elif PREFETCH_TABS > 0:
+        tab_prefetcher = TabPrefetcher(PREFETCH_TABS)
+        try:
+            start_crawl(tab_prefetcher.submit, checkpoint)
+            tab_prefetcher.flush()
+        finally:
+            tab_prefetcher = None
+    else:
+        start_crawl(process_card_serial, checkpoint)
+    clear_checkpoint()
+    if INCREMENTAL and crawl_complete and applied_so_far() < MAX_APPLY:
+        save_watermark()
+    elif INCREMENTAL:
+        logging.info("Incremental: crawl stopped before catching up; watermark left as it was.")
+
+def run_once(ctx, warm=False):
+    """
+    One search-and-apply pass in the running browser: log in, crawl (or resume), record and export.
+    With a QUERIES_FILE, every configured query runs at once instead (see run_fanout).
+    Returns the number applied, or None after a fatal error (logged, screenshot taken).
+    """
+    global existing_job_ids
+    reset_run_state()
+    existing_job_ids = {row[0] for row in ledger.execute("SELECT DISTINCT job_id FROM jobs")}
+    logging.info(f"Loaded {len(existing_job_ids)} known job ids from ledger {LEDGER_FILE}")
+    first_row_id = ledger.execute("SELECT COALESCE(MAX(id), 0) FROM jobs").fetchone()[0]
+
+    try:
+        plan = load_query_plan()
+        if plan:
+            applied = run_fanout(ctx, plan)
+        else:
+            log_in(warm)
+            search_and_crawl(ctx)
+            applied = applied_so_far()
+
+        # Main loop done
+        logging.info(f"Completed. Total applied: {applied}")
+        finish_process(close=False)
+        print(f"\nDone. Applied {applied} jobs. Excel: {EXCEL_FILE}")
+        try:
+            export_excel(ledger, EXCEL_FILE)
+        except Exception:
+            logging.warning("Failed to export Excel at final step.")
+        return applied
+
+    except Exception as fatal:
+        logging.exception("Fatal error during script execution")
+        print(f"Fatal error: {fatal}. See naukri_log.txt and {ARTIFACTS_DIR or 'the log'}.")
+        capture_failure("fatal", error=fatal)
+        try:
+            export_excel(ledger, EXCEL_FILE)
+        except Exception:
+            pass
+        return None
+    finally:
+        if SPANS_FILE:
+            status_counts = ledger.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE id > ? GROUP BY status ORDER BY COUNT(*) DESC", (first_row_id,)
+            ).fetchall()
+            try:
+                report = build_run_report(status_counts)
+                logging.info(report)
+                print("\n" + report)
+            except Exception as e:
+                logging.warning(f"Could not build run report: {e}")
+
+# ---------------- DAEMON MODE ----------------
+# `python naukri_apply.py --daemon` keeps one Chrome and its login warm and runs searches on request:
+# every DAEMON_INTERVAL_MINUTES with the configured SKILLS/EXPERIENCE, and for each JSON file dropped
+# into DAEMON_QUEUE_DIR, e.g. {"skills": "Java, Kafka", "experience": "8", "max_apply": 10}.
+# A request file is claimed by renaming it to .running and ends up as .done or .failed with the result.
+# {"command": "stop"} shuts the daemon down, as do Ctrl+C and SIGTERM.
+# Request/profile keys -> config globals (and env vars) they override
+RUN_SETTINGS = {
+    "skills": "SKILLS", "experience": "EXPERIENCE", "max_apply": "MAX_APPLY",
+    "email": "NAUKRI_EMAIL", "password": "NAUKRI_PASSWORD", "session_file": "SESSION_FILE",
+    "chatbot_profile": "PROFILE_FILE",
+}
+
+def account_session_file(email):
+    """Default session file for another account: SESSION_FILE with the email worked into the name."""
+    root, ext = os.path.splitext(SESSION_FILE)
+    account = re.sub(r"[^\w.@-]", "_", email)
+    return f"{root}_{account}{ext}"
+
+@contextmanager
+def run_settings(request):
+    """Apply a request's settings (see RUN_SETTINGS) here and, via the env, in processes spawned meanwhile."""
+    global chatbot_profile
+    module = globals()
+    # Another account keeps its own saved session unless the request names one
+    email = request.get("email")
+    if email and email != NAUKRI_EMAIL and request.get("session_file") is None and SESSION_FILE:
+        request = {**request, "session_file": account_session_file(str(email))}
+    saved = {name: module[name] for name in RUN_SETTINGS.values()}
+    saved_env = {name: os.environ.get(name) for name in RUN_SETTINGS.values()}
+    saved_profile = chatbot_profile
+    try:
+        for key, name in RUN_SETTINGS.items():
+            if request.get(key) is not None:
+                module[name] = int(request[key]) if name == "MAX_APPLY" else str(request[key])
+                os.environ[name] = str(request[key])
+        if request.get("chatbot_profile") is not None or request.get("experience") is not None:
+            chatbot_profile = load_chatbot_profile()
+        yield
+    finally:
+        module.update(saved)
+        chatbot_profile = saved_profile
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+def check_request(request):
+    """The request with its settings converted to their types; ValueError names the first bad field."""
+    if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+    checked = dict(request)
+    for key in RUN_SETTINGS:
+        value = request.get(key)
+        if value is None:
+            continue
+        if key == "max_apply":
+            if isinstance(value, bool) or not str(value).strip().isdigit():
+                raise ValueError(f"max_apply must be a whole number, got {value!r}")
+            checked[key] = int(value)
+        elif isinstance(value, (dict, list)):
+            raise ValueError(f"{key} must be a string, got {value!r}")
+    if request.get("command") not in (None, "stop"):
+        raise ValueError(f"unknown command {request['command']!r}")
+    return checked
+
+def claim_request():
+    """Oldest *.json request in DAEMON_QUEUE_DIR, claimed by renaming; returns (path, request) or (None, None)."""
+    names = [n for n in os.listdir(DAEMON_QUEUE_DIR) if n.endswith(".json")]
+    paths = sorted((os.path.join(DAEMON_QUEUE_DIR, n) for n in names), key=os.path.getmtime)
+    for path in paths:
+        claimed = path[:-len(".json")] + ".running"
+        try:
+            os.replace(path, claimed)
+        except OSError:
+            continue  # taken by someone else or removed
+        request = None
+        try:
+            with open(claimed) as f:
+                request = json.load(f)
+            request = check_request(request)
+        except ValueError as e:
+            logging.warning(f"Bad daemon request {path}: {e}")
+            finish_request(claimed, request if isinstance(request, dict) else {}, {"status": "failed", "error": str(e)})
+            continue
+        return claimed, request
+    return None, None
+
+def finish_request(claimed, request, result):
+    """Write the request back with its result as <name>.done or <name>.failed."""
+    final = claimed[:-len(".running")] + (".done" if result.get("status") == "done" else ".failed")
+    try:
+        with open(claimed, "w") as f:
+            json.dump({**request, "result": result}, f, indent=2)
+        os.replace(claimed, final)
+    except OSError as e:
+        logging.warning(f"Could not finish daemon request {claimed}: {e}")
+
+def run_daemon(ctx):
+    global RUN_ID
+    os.makedirs(DAEMON_QUEUE_DIR, exist_ok=True)
+    # Requests a previous daemon was running when it died go back to the queue
+    for name in os.listdir(DAEMON_QUEUE_DIR):
+        if name.endswith(".running"):
+            os.replace(os.path.join(DAEMON_QUEUE_DIR, name), os.path.join(DAEMON_QUEUE_DIR, name[:-len(".running")] + ".json"))
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    print(f"Daemon started: queue {DAEMON_QUEUE_DIR}, schedule every {DAEMON_INTERVAL_MINUTES or '-'} min")
+    logging.info(f"Daemon started (queue {DAEMON_QUEUE_DIR}, interval {DAEMON_INTERVAL_MINUTES} min)")
+    next_scheduled = time.monotonic() if DAEMON_INTERVAL_MINUTES > 0 else None
+    warm = False
+    while True:
+        claimed, request = claim_request()
+        if request is None:
+            if next_scheduled is None or time.monotonic() < next_scheduled:
+                time.sleep(1)
+                continue
+            next_scheduled = time.monotonic() + DAEMON_INTERVAL_MINUTES * 60
+            request = {}
+        if request.get("command") == "stop":
+            finish_request(claimed, request, {"status": "done"})
+            logging.info("Daemon stop requested")
+            return
+
+        RUN_ID = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        os.environ["NAUKRI_RUN_ID"] = RUN_ID
+        if not browser_alive():
+            logging.warning("Browser is gone; starting a new one")
+            recycle_browser()
+            warm = False
+        logging.info(f"Daemon run {RUN_ID}: {request or 'scheduled'}")
+        error = None
+        try:
+            with run_settings(request):
+                applied = run_once(ctx, warm)
+        except Exception as e:
+            # a request that slipped past check_request must not take the daemon down
+            logging.exception(f"Daemon run {RUN_ID} failed")
+            applied, error = None, str(e)
+        ok = applied is not None
+        if claimed:
+            result = {"status": "done" if ok else "failed", "run_id": RUN_ID, "applied": applied}
+            if error:
+                result["error"] = error
+            finish_request(claimed, request, result)
+        warm = ok
+        if not ok:
+            # Whatever broke the run may have left Chrome unusable
+            recycle_browser()
+
+def main():
+    global ledger, apply_budget
+    logging.info("Script started")
+    print(f"Script started (HEADLESS={HEADLESS}). Check naukri_log.txt for detail.")
+
+    ledger = open_ledger(LEDGER_FILE)
+    imported = import_excel_history(ledger, EXCEL_FILE)
+    if imported:
+        logging.info(f"Imported {imported} rows from {EXCEL_FILE} into ledger {LEDGER_FILE}")
+
+    if "--export-excel" in sys.argv:
+        export_excel(ledger, EXCEL_FILE)
+        print(f"Exported ledger {LEDGER_FILE} to {EXCEL_FILE}")
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    apply_budget = ctx.Array("i", 2)
+
+    # Debug aid: parse the cards of a results page fetched over HTTP (e.g. a local stand-in) and exit.
+    if "--harvest" in sys.argv:
+        url = sys.argv[sys.argv.index("--harvest") + 1]
+        print(json.dumps(fetch_job_cards(make_http_session(), url), indent=2))
+        return
+
+    # Page-load comparison with and without resource blocking, e.g. against fixtures served locally.
+    # It launches a browser per mode itself.
+    if "--compare-blocking" in sys.argv:
+        urls = [a for a in sys.argv[sys.argv.index("--compare-blocking") + 1:] if not a.startswith("--")]
+        compare_resource_blocking(urls)
+        return
+
+    start_browser()
+
+    # Debug aid: dump the card records of any results page (e.g. a saved fixture served locally) and exit.
+    if "--extract-cards" in sys.argv:
+        driver.get(sys.argv[sys.argv.index("--extract-cards") + 1])
+        print(json.dumps(extract_job_cards(), indent=2))
+        driver.quit()
+        return
+
+    try:
+        if "--daemon" in sys.argv:
+            run_daemon(ctx)
+        else:
+            run_once(ctx)
+    except KeyboardInterrupt:
+        logging.info("Interrupted")
+    finally:
+        flush_artifacts()
+        try:
+            if driver:
+                driver.quit()
+        except Exception:
+            pass
+        ledger.close()
+        logging.info("Script finished (final).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Offline test setup: naukri_apply is imported from a scratch working directory, so the log file and the
+state files it reads at import (chatbot profile and answers, selector stats) never touch the checkout.
+No browser is started; tests that reach the driver get FakeDriver.
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "fixtures")
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="naukri-tests-"))
+
+import mock_naukri  # noqa: E402
+import naukri_apply  # noqa: E402
+
+
+class FakeDriver:
+    """Just enough of a WebDriver for the crawl bookkeeping around the HTTP harvester."""
+
+    current_url = ""
+    window_handles = ["main"]
+
+    def get_cookies(self):
+        return []
+
+    def execute_script(self, script, *args):
+        return None
+
+
+@pytest.fixture
+def na(monkeypatch, tmp_path):
+    """naukri_apply with a fresh ledger and apply budget, no pacing and a fake browser."""
+    ledger = naukri_apply.open_ledger(str(tmp_path / "ledger.db"))
+    monkeypatch.setattr(naukri_apply, "ledger", ledger)
+    monkeypatch.setattr(naukri_apply, "existing_job_ids", set())
+    monkeypatch.setattr(naukri_apply, "apply_budget", multiprocessing.Array("i", 2))
+    monkeypatch.setattr(naukri_apply, "pacer", None)
+    monkeypatch.setattr(naukri_apply, "driver", FakeDriver())
+    monkeypatch.setattr(naukri_apply, "RUN_ID", "test-run")
+    yield naukri_apply
+    ledger.close()
+
+
+@pytest.fixture
+def mock_site(monkeypatch):
+    """Start the mock site with the given MockConfig options and point BASE_URL at it."""
+    servers = []
+
+    def start(**options):
+        server, base_url = mock_naukri.start_mock_server(mock_naukri.MockConfig(**options))
+        servers.append(server)
+        monkeypatch.setattr(naukri_apply, "BASE_URL", base_url)
+        return base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+
+def job(job_id):
+    return (job_id, f"Java Developer {job_id}", "Acme", "30 LPA", f"http://localhost/job-listings-{job_id}")
+
+
+def add_in_flight(na, job_id, stage, run_id):
+    with na.ledger:
+        na.ledger.execute(
+            "INSERT INTO in_flight (job_id, job, stage, run_id) VALUES (?, ?, ?, ?)",
+            (job_id, json.dumps(job(job_id)), stage, run_id),
+        )
+
+
+def in_flight_ids(na):
+    return {row[0] for row in na.ledger.execute("SELECT job_id FROM in_flight")}
+
+
+@pytest.fixture
+def reopened(na, monkeypatch):
+    """Jobs recover_in_flight opens again, instead of a real process_job."""
+    opened = []
+    monkeypatch.setattr(na, "process_job", lambda j: opened.append(j))
+    monkeypatch.setattr(na, "resumed_clicks", set())
+    return opened
+
+
+def test_recover_in_flight_reopens_unrecorded_jobs(na, reopened):
+    add_in_flight(na, "1", "opened", "old-run")
+    add_in_flight(na, "2", "apply_clicked", "old-run")
+    add_in_flight(na, "3", "queued", "old-run")
+    na.existing_job_ids.add("3")  # recorded before the run died
+
+    assert na.recover_in_flight() == 3
+    assert sorted(j[0] for j in reopened) == ["1", "2"]
+    assert reopened[0] == job(reopened[0][0])
+    assert na.resumed_clicks == {"2"}
+    assert in_flight_ids(na) == set()
+
+
+def test_recover_in_flight_only_clears_without_reopen(na, reopened):
+    add_in_flight(na, "1", "opened", "old-run")
+    add_in_flight(na, "2", "apply_clicked", None)
+
+    assert na.recover_in_flight(reopen=False) == 2
+    assert reopened == []
+    assert in_flight_ids(na) == set()
+
+
+def test_recover_in_flight_leaves_this_runs_jobs(na, reopened):
+    add_in_flight(na, "1", "opened", na.RUN_ID)  # another fan-out query of this run is on it
+    add_in_flight(na, "2", "opened", "old-run")
+
+    assert na.recover_in_flight() == 1
+    assert [j[0] for j in reopened] == ["2"]
+    assert in_flight_ids(na) == {"1"}
+
+
+def test_checkpoint_round_trip_and_expiry(na, monkeypatch):
+    monkeypatch.setattr(na, "SKILLS", "Java")
+    monkeypatch.setattr(na, "EXPERIENCE", "8")
+    na.apply_budget[0] = 4
+    na.save_checkpoint(3, "http://localhost/java-jobs-3", {"http://localhost/java-jobs-2"})
+
+    checkpoint = na.load_checkpoint()
+    assert checkpoint["page_num"] == 3
+    assert checkpoint["visited_pages"] == {"http://localhost/java-jobs-2"}
+    assert checkpoint["applied_count"] == 4
+
+    monkeypatch.setattr(na, "RESUME_MAX_AGE_HOURS", -1)
+    assert na.load_checkpoint() is None
+    na.clear_checkpoint()
+    monkeypatch.setattr(na, "RESUME_MAX_AGE_HOURS", 12)
+    assert na.load_checkpoint() is None
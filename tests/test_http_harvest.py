@@ -0,0 +1,59 @@
+import os
+
+import pytest
+import requests
+
+from conftest import FIXTURES
+
+
+def parse(na, html, base_url="http://localhost:8000/search_results.html"):
+    parser = na.JobCardParser(base_url)
+    parser.feed(html)
+    parser.close()
+    return parser.cards
+
+
+def test_parser_reads_fixture_cards(na):
+    with open(os.path.join(FIXTURES, "search_results.html"), encoding="utf-8") as f:
+        cards = parse(na, f.read())
+
+    assert [c["job_id"] for c in cards] == ["100000000001", "100000000002", "100000000003"]
+    first = cards[0]
+    assert first["title"] == "Senior Java Developer"
+    assert first["link"] == "http://localhost:8000/job-listings-senior-java-developer-acme-100000000001"
+    assert first["company"] == "Acme Software"
+    assert first["salary"] == "30-45 Lacs PA"
+    assert first["experience"] == "8-13 Yrs"
+    assert first["location"] == "Bengaluru, Pune"
+    assert first["posted"] == "3 Days Ago"
+    assert first["tags"] == ["Java", "Spring Boot", "Microservices", "Kafka"]
+    # company under the subTitle class, and the Applied tag
+    assert cards[1]["company"] == "Globex"
+    assert [c["applied"] for c in cards] == [False, False, True]
+
+
+def test_parser_ignores_pages_without_cards(na):
+    assert parse(na, "<html><body><div class='styles_jlc__main'></div></body></html>") == []
+
+
+def test_fetch_job_cards_reads_mock_results(na, mock_site):
+    base_url = mock_site(jobs_per_page=12)
+    cards = na.fetch_job_cards(requests.Session(), na.build_search_url("Java", "8", 2))
+    assert len(cards) == 12
+    assert cards[0]["job_id"] == "200000002000"
+    assert cards[0]["link"].startswith(base_url)
+
+
+def test_fetch_job_cards_flags_captcha_pages(na, mock_site):
+    base_url = mock_site(captcha_every=1)
+    with pytest.raises(na.PageHealthError) as raised:
+        na.fetch_job_cards(requests.Session(), base_url + "job-listings-java-developer-200000001001")
+    assert raised.value.health == "captcha"
+
+
+def test_fetch_job_cards_raises_on_throttling(na, mock_site):
+    mock_site(throttle_rps=1)
+    session = requests.Session()
+    na.fetch_job_cards(session, na.build_search_url("Java", "8", 1))
+    with pytest.raises(requests.HTTPError):
+        na.fetch_job_cards(session, na.build_search_url("Java", "8", 2))
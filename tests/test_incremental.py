@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+
+def card(job_id, posted="0 Days Ago", applied=False):
+    return {"job_id": job_id, "posted": posted, "applied": applied}
+
+
+@pytest.fixture
+def incremental(na, monkeypatch):
+    monkeypatch.setattr(na, "INCREMENTAL", True)
+    monkeypatch.setattr(na, "INCREMENTAL_STOP_STREAK", 3)
+    monkeypatch.setattr(na, "SKILLS", "Java")
+    monkeypatch.setattr(na, "EXPERIENCE", "8")
+    na.load_watermark()
+    return na
+
+
+def test_incremental_cut_off_when_not_incremental(na, monkeypatch):
+    monkeypatch.setattr(na, "INCREMENTAL", False)
+    cards = [card("1"), card("2")]
+    assert na.incremental_cut(cards) == (cards, False)
+
+
+def test_incremental_cut_stops_after_a_stale_streak(incremental):
+    incremental.existing_job_ids.update({"3", "4", "5"})
+    cards = [card("1"), card("2"), card("3"), card("4"), card("5"), card("6")]
+    kept, caught_up = incremental.incremental_cut(cards)
+    assert caught_up
+    assert [c["job_id"] for c in kept] == ["1", "2", "3", "4", "5"]
+
+
+def test_incremental_cut_streak_carries_across_pages(incremental):
+    incremental.existing_job_ids.update({"3", "4", "5"})
+    assert incremental.incremental_cut([card("1"), card("3"), card("4")]) == ([card("1"), card("3"), card("4")], False)
+    kept, caught_up = incremental.incremental_cut([card("5"), card("6")])
+    assert caught_up and [c["job_id"] for c in kept] == ["5"]
+
+
+def test_incremental_cut_breaks_streak_on_a_new_card(incremental):
+    incremental.existing_job_ids.update({"1", "2", "4", "5"})
+    kept, caught_up = incremental.incremental_cut([card("1"), card("2"), card("3"), card("4"), card("5")])
+    assert not caught_up and len(kept) == 5
+
+
+def test_watermark_ids_and_age_make_cards_stale(incremental):
+    with incremental.ledger:
+        incremental.ledger.execute(
+            "INSERT INTO watermarks (query, last_run_at, newest_ids) VALUES (?, ?, ?)",
+            (incremental.checkpoint_query(), time.time() - 2 * 86400, '["10"]'),
+        )
+    incremental.load_watermark()
+    assert incremental.card_is_stale(card("10"))
+    assert incremental.card_is_stale(card("11", posted="5 Days Ago"))
+    assert not incremental.card_is_stale(card("12", posted="1 Day Ago"))
+    assert incremental.card_is_stale(card("13", applied=True))
+
+
+def harvest(na, monkeypatch, handled):
+    monkeypatch.setattr(na, "HARVEST_MODE", "http")
+    monkeypatch.setattr(na, "card_rules", [])
+    na.harvest_http(lambda job, c: handled.append(job[0]))
+
+
+def test_harvest_completes_when_results_run_out(incremental, mock_site, monkeypatch):
+    mock_site(pages=2, jobs_per_page=5)
+    handled = []
+    harvest(incremental, monkeypatch, handled)
+    assert len(handled) == 10 - sum(1 for n in range(5, 15) if n % 17 == 5)  # minus Applied-tagged cards
+    assert incremental.crawl_complete
+
+
+def test_harvest_completes_when_caught_up(incremental, mock_site, monkeypatch):
+    mock_site(pages=4, jobs_per_page=5)
+    incremental.existing_job_ids.update(str(200000002000 + i) for i in range(5))
+    harvest(incremental, monkeypatch, [])
+    assert incremental.crawl_complete
+
+
+def test_harvest_throttled_page_leaves_crawl_incomplete(incremental, mock_site, monkeypatch):
+    mock_site(pages=4, jobs_per_page=5, throttle_rps=1)
+    handled = []
+    harvest(incremental, monkeypatch, handled)
+    assert handled  # page 1 was read
+    assert not incremental.crawl_complete
+
+
+def test_harvest_page_cap_leaves_crawl_incomplete(incremental, mock_site, monkeypatch):
+    mock_site(pages=4, jobs_per_page=5)
+    monkeypatch.setattr(incremental, "HARVEST_MAX_PAGES", 2)
+    harvest(incremental, monkeypatch, [])
+    assert not incremental.crawl_complete
+
+
+def test_harvest_max_apply_leaves_crawl_incomplete(incremental, mock_site, monkeypatch):
+    mock_site(pages=2, jobs_per_page=5)
+    monkeypatch.setattr(incremental, "MAX_APPLY", 1)
+    incremental.apply_budget[0] = 1
+    harvest(incremental, monkeypatch, [])
+    assert not incremental.crawl_complete
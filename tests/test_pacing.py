@@ -0,0 +1,17 @@
+def test_pacer_backs_off_and_recovers(na):
+    pacer = na.PaceController(rate=2, min_rate=0.2, max_rate=4)
+    pacer.observe("ok", 1)
+    assert pacer.rate == 2 + na.PACE_STEP
+    pacer.observe("error", 1)
+    assert pacer.rate == (2 + na.PACE_STEP) * na.PACE_BACKOFF
+    pacer.observe("ok", na.PACE_SLOW_LOAD + 1)  # slow load counts as trouble
+    assert pacer.backoffs == {"error": 1, "slow": 1}
+    pacer.observe("captcha")
+    assert pacer.rate == 0.2 == pacer.lowest
+
+
+def test_pacer_token_bucket_allows_a_burst(na):
+    pacer = na.PaceController(rate=4, min_rate=0.2, max_rate=4, burst=2)
+    assert pacer.acquire() == 0 and pacer.acquire() == 0
+    assert pacer.acquire() > 0
+    assert pacer.actions == 3
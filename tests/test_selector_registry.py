@@ -0,0 +1,31 @@
+import json
+
+
+CHAINS = {"apply_button": ["#apply-old", "#apply-button", "text:^apply$"]}
+
+
+def test_selector_chain_promotes_the_strategy_that_hits(na, tmp_path):
+    registry = na.SelectorRegistry(CHAINS, str(tmp_path / "stats.json"))
+    assert registry.chain("apply_button") == CHAINS["apply_button"]
+    for _ in range(5):
+        chain = registry.chain("apply_button")
+        registry.record("apply_button", chain, chain.index("#apply-button"))
+    assert registry.chain("apply_button")[0] == "#apply-button"
+
+
+def test_selector_stats_merge_across_processes(na, tmp_path):
+    path = str(tmp_path / "stats.json")
+    first = na.SelectorRegistry(CHAINS, path)
+    second = na.SelectorRegistry(CHAINS, path)
+    first.record("apply_button", CHAINS["apply_button"], 1)
+    second.record("apply_button", CHAINS["apply_button"], -1)
+    first.save()
+    second.save()
+
+    with open(path) as f:
+        saved = json.load(f)
+    assert saved["elements"]["apply_button"]["lookups"] == 2
+    assert saved["elements"]["apply_button"]["found"] == 1
+    assert saved["strategies"]["apply_button"]["#apply-old"]["misses"] == 1
+    # a reloaded registry starts from the merged order
+    assert na.SelectorRegistry(CHAINS, path).chain("apply_button")[0] == "#apply-button"